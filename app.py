@@ -1,62 +1,75 @@
 """Main Flask application - refactored and modular."""
 
 import os
-import secrets
-from flask import Flask, request, jsonify, g
-from flask_wtf.csrf import CSRFProtect
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+import time
+import base64
+import threading
+from functools import wraps
+from datetime import datetime
+from flask import Flask, Response, request, jsonify, g, session
 from config import (
     SECRET_KEY,
     DEBUG_MODE,
     PROD,
+    PORT,
     print_debug_info,
     validate_config,
+    _startup_errors,
     POSTHOG_API_KEY,
     POSTHOG_HOST,
     POSTHOG_ENABLED,
+    RATELIMIT_STORAGE_URI,
 )
-from utils.db_init import init_db, check_table_exists, list_all_tables
-from utils.database import get_db_connection
-from utils.rate_limiter import rate_limit_api_key, start_cleanup_thread
-from utils.censoring import register_censoring_filters
-from routes.auth import auth_bp, oauth_bp
-from routes.admin import admin_bp
-# from routes.admin_database import admin_database_bp  # DEPRECATED: Database swap feature obsolete with Teable migration
-from routes.opt_out import opt_out_bp
-from models.api_key import get_key_permissions, log_api_key_usage
-
-# Create Flask app
-app = Flask(__name__)
-app.secret_key = SECRET_KEY
-
-# Configure secure session cookies
-app.config.update(
-    SESSION_COOKIE_SECURE=PROD,  # Only send over HTTPS in production
-    SESSION_COOKIE_HTTPONLY=True,  # Prevent XSS access to cookies
-    SESSION_COOKIE_SAMESITE="Lax",  # CSRF protection
-    PERMANENT_SESSION_LIFETIME=3600,  # 1 hour session timeout
-)
+from utils.database import get_reader
+
+
+# CSP nonces are drawn from a buffer filled by one os.urandom() read per batch
+# (16 random bytes each, same entropy as secrets.token_urlsafe(16)).
+_CSP_NONCE_BATCH = 1024
+_csp_nonces = []
+_csp_nonce_pid = None
+_csp_nonce_lock = threading.Lock()
 
-# Register censoring filters for templates
-register_censoring_filters(app)
 
-# Initialize CSRF protection
-csrf = CSRFProtect(app)
+def _refill_csp_nonces():
+    """Refill the nonce buffer, discarding any nonces inherited across a fork."""
+    global _csp_nonce_pid
+
+    with _csp_nonce_lock:
+        if _csp_nonce_pid != os.getpid():
+            _csp_nonces.clear()
+            _csp_nonce_pid = os.getpid()
+        if _csp_nonces:
+            return
+
+        raw = os.urandom(16 * _CSP_NONCE_BATCH)
+        _csp_nonces.extend(
+            base64.urlsafe_b64encode(raw[i : i + 16]).rstrip(b"=").decode("ascii")
+            for i in range(0, len(raw), 16)
+        )
+
+
+def _next_csp_nonce():
+    """Take an unused nonce from the buffer."""
+    if _csp_nonce_pid != os.getpid():
+        _refill_csp_nonces()
+
+    while True:
+        try:
+            return _csp_nonces.pop()
+        except IndexError:
+            _refill_csp_nonces()
 
 
 # Generate a unique nonce for each request for CSP
-@app.before_request
 def set_csp_nonce():
-    g.csp_nonce = secrets.token_urlsafe(16)
+    g.csp_nonce = _next_csp_nonce()
 
 
 # PostHog context processor
-@app.context_processor
 def inject_posthog():
     """Inject PostHog configuration and user data into all templates."""
-    from flask import session
-    from models.user import get_user_by_email
+    from models.user import get_cached_user_by_email
 
     context = {
         'posthog_enabled': POSTHOG_ENABLED,
@@ -65,9 +78,13 @@ def inject_posthog():
         'user_logged_in': 'user_email' in session,
     }
 
-    # Add user data if logged in
-    if 'user_email' in session:
-        user = get_user_by_email(session['user_email'])
+    # Add user data if logged in. Only the PostHog snippet in base.html reads
+    # it, so skip the user lookup (and events decoding) when PostHog is off.
+    if POSTHOG_ENABLED and 'user_email' in session:
+        # Memoize per request: context processors run for every render
+        if "posthog_user" not in g:
+            g.posthog_user = get_cached_user_by_email(session['user_email'])
+        user = g.posthog_user
         if user:
             context.update({
                 'user_email': user['email'],
@@ -78,75 +95,45 @@ def inject_posthog():
 
     return context
 
-# Initialize rate limiter (disabled in development)
-if not DEBUG_MODE:
-    limiter = Limiter(
-        app=app,
-        key_func=get_remote_address,
-        default_limits=["200 per day", "50 per hour"],
-        storage_uri="memory://",
-    )
-
-    # Apply stricter rate limits to auth endpoints
-    limiter.limit("5 per minute")(auth_bp)
-else:
-    # No rate limiting in development mode
-    print("DEBUG: Rate limiting disabled in development mode")
-
-# Register blueprints
-app.register_blueprint(auth_bp)
-app.register_blueprint(admin_bp)
-# app.register_blueprint(admin_database_bp)  # DEPRECATED: Database swap feature obsolete with Teable
-app.register_blueprint(opt_out_bp)
-
-# Admin routes keep CSRF protection for security
-
-# Import and register API blueprint
-from routes.api import api_bp
-
-app.register_blueprint(api_bp)
-
-# Exempt API endpoints from CSRF protection (they use API key auth)
-csrf.exempt(api_bp)
-
-# Register OAuth 2.0 blueprint and exempt from CSRF (uses client_secret auth)
-app.register_blueprint(oauth_bp)
-csrf.exempt(oauth_bp)
-
-# Import and register event admin blueprint
-from routes.event_admin import event_admin_bp
+# Security headers, built once at import. The CSP nonce is spliced in per response.
+_CSP_NONCE_PLACEHOLDER = "__CSP_NONCE__"
+_CSP_TEMPLATE = (
+    "default-src 'self'; "
+    "script-src 'self' https://cdn.jsdelivr.net https://us-assets.i.posthog.com https://code.jquery.com https://cdn.datatables.net 'nonce-__CSP_NONCE__'; "
+    "style-src 'self' https://cdn.jsdelivr.net https://fonts.googleapis.com https://cdn.datatables.net 'nonce-__CSP_NONCE__'; "
+    "img-src 'self' data: https:; "
+    "font-src 'self' https://fonts.gstatic.com; "
+    "connect-src 'self' https://us.i.posthog.com; "
+    "frame-ancestors 'none';"
+)
 
-app.register_blueprint(event_admin_bp)
+_STATIC_SECURITY_HEADERS = {
+    "X-Frame-Options": "DENY",
+    "X-Content-Type-Options": "nosniff",
+    "X-XSS-Protection": "1; mode=block",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+}
+
+# HSTS for production
+if PROD:
+    _STATIC_SECURITY_HEADERS["Strict-Transport-Security"] = (
+        "max-age=31536000; includeSubDomains"
+    )
 
 
 # Security headers middleware
-@app.after_request
 def add_security_headers(response):
     """Add security headers to all responses."""
-    # Content Security Policy
-    nonce = g.get("csp_nonce", "")
-    csp = (
-        "default-src 'self'; "
-        f"script-src 'self' https://cdn.jsdelivr.net https://us-assets.i.posthog.com https://code.jquery.com https://cdn.datatables.net 'nonce-{nonce}'; "
-        f"style-src 'self' https://cdn.jsdelivr.net https://fonts.googleapis.com https://cdn.datatables.net 'nonce-{nonce}'; "
-        "img-src 'self' data: https:; "
-        "font-src 'self' https://fonts.gstatic.com; "
-        "connect-src 'self' https://us.i.posthog.com; "
-        "frame-ancestors 'none';"
+    headers = response.headers
+
+    # Content Security Policy (the nonce is missing if an earlier
+    # before_request hook aborted)
+    headers["Content-Security-Policy"] = _CSP_TEMPLATE.replace(
+        _CSP_NONCE_PLACEHOLDER, g.get("csp_nonce", "")
     )
-    response.headers["Content-Security-Policy"] = csp
 
     # Other security headers
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
-    # HSTS for production
-    if PROD:
-        response.headers["Strict-Transport-Security"] = (
-            "max-age=31536000; includeSubDomains"
-        )
+    headers.update(_STATIC_SECURITY_HEADERS)
 
     return response
 
@@ -154,90 +141,124 @@ def add_security_headers(response):
 def require_api_key(required_permissions=None):
     """Decorator to require API key authentication with specific permissions."""
 
+    # Normalize once at decoration time rather than on every request
+    if isinstance(required_permissions, str):
+        required_perms = frozenset([required_permissions])
+    elif required_permissions is not None:
+        required_perms = frozenset(required_permissions)
+    else:
+        required_perms = None
+
     def decorator(f):
+        from models.api_key import get_key_permissions, MIN_API_KEY_LENGTH
+        from utils.usage_logger import enqueue_api_key_usage
+
+        @wraps(f)
         def wrapper(*args, **kwargs):
-            auth_header = request.headers.get("Authorization")
-            if not auth_header or not auth_header.startswith("Bearer "):
+            # Raw WSGI environ lookup skips the case-insensitive header mapping
+            auth_header = request.environ.get("HTTP_AUTHORIZATION", "")
+            if not auth_header.startswith("Bearer "):
                 return (
                     jsonify({"error": "Missing or invalid Authorization header"}),
                     401,
                 )
 
             api_key = auth_header[7:]  # Remove "Bearer " prefix
-            permissions = get_key_permissions(api_key)
+            if len(api_key) < MIN_API_KEY_LENGTH:
+                return jsonify({"error": "Invalid API key"}), 403
+
+            # Stacked require_api_key checks reuse the first lookup of the request
+            cached = getattr(g, "api_key_auth", None)
+            first_check = cached is None or cached[0] != api_key
+            if first_check:
+                permissions = get_key_permissions(api_key)
+                g.api_key_auth = (api_key, permissions)
+            else:
+                permissions = cached[1]
 
             if not permissions:  # Key doesn't exist or has no permissions
                 return jsonify({"error": "Invalid API key"}), 403
 
-            # Check required permissions
-            if required_permissions is not None:
-                required_perms = required_permissions
-                if isinstance(required_perms, str):
-                    required_perms = [required_perms]
-
-                if not any(perm in permissions for perm in required_perms):
-                    return jsonify({"error": "Insufficient permissions"}), 403
-
-            # Log the API usage
-            log_api_key_usage(
-                api_key,
-                f.__name__,
-                {
-                    "endpoint": request.endpoint,
-                    "method": request.method,
-                    "ip": request.remote_addr,
-                },
-            )
+            # Check required permissions (any one of them is sufficient)
+            if required_perms is not None and permissions.isdisjoint(required_perms):
+                return jsonify({"error": "Insufficient permissions"}), 403
+
+            # Log the API usage once per request (written in the background)
+            if first_check:
+                environ = request.environ
+                enqueue_api_key_usage(
+                    api_key,
+                    f.__name__,
+                    {
+                        "endpoint": request.endpoint,
+                        "method": environ.get("REQUEST_METHOD"),
+                        "ip": environ.get("REMOTE_ADDR"),
+                    },
+                )
 
             return f(*args, **kwargs)
 
-        wrapper.__name__ = f.__name__
         return wrapper
 
     return decorator
 
 
+# Successful database probes are reused for this long (seconds)
+HEALTH_CHECK_TTL = 1.0
+_last_healthy_probe = 0.0
+
+
 # Health check endpoint (for Docker/Kubernetes)
-@app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint for container orchestration."""
+    global _last_healthy_probe
+
+    now = time.monotonic()
+    if now - _last_healthy_probe < HEALTH_CHECK_TTL:
+        return jsonify({
+            "status": "healthy",
+            "service": "hack-id",
+            "database": "connected",
+            "cached": True
+        }), 200
+
     try:
         # Check database connectivity
-        conn = get_db_connection()
-        conn.execute("SELECT 1").fetchone()
-        conn.close()
+        with get_reader() as conn:
+            conn.execute("SELECT 1").fetchone()
 
+        _last_healthy_probe = now
         return jsonify({
             "status": "healthy",
             "service": "hack-id",
             "database": "connected"
         }), 200
     except Exception as e:
+        _last_healthy_probe = 0.0
         return jsonify({
             "status": "unhealthy",
             "error": str(e)
         }), 503
 
 
+# The /api/test body is constant apart from the timestamp, so it is
+# serialized once (same bytes jsonify would produce) and spliced per request
+_API_TEST_PREFIX = b'{"message":"API key authentication successful!","success":true,"timestamp":"'
+_API_TEST_SUFFIX = b'"}\n'
+
+
 # Test API endpoint
-@app.route("/api/test", methods=["GET"])
-@require_api_key(["users.read"])
-@rate_limit_api_key
 def api_test():
     """Test endpoint that requires API key with users.read permission."""
-    from datetime import datetime
-
-    return jsonify(
-        {
-            "success": True,
-            "message": "API key authentication successful!",
-            "timestamp": datetime.now().isoformat(),
-        }
+    timestamp = datetime.now().isoformat().encode("ascii")
+    return Response(
+        _API_TEST_PREFIX + timestamp + _API_TEST_SUFFIX, mimetype="application/json"
     )
 
 
 def verify_teable_tables():
     """Verify Teable tables are accessible and print record counts."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
     from utils.teable import count_records, TEABLE_TABLE_IDS
 
     print("\n" + "="*60)
@@ -245,18 +266,29 @@ def verify_teable_tables():
     print("="*60)
 
     all_accessible = True
+    configured_tables = []
     for table_name, table_id in TEABLE_TABLE_IDS.items():
         if not table_id:
             print(f"  ❌ {table_name}: Not configured")
             all_accessible = False
-            continue
-
-        try:
-            count = count_records(table_name)
-            print(f"  ✅ {table_name}: {count} records")
-        except Exception as e:
-            print(f"  ❌ {table_name}: Error - {str(e)}")
-            all_accessible = False
+        else:
+            configured_tables.append(table_name)
+
+    # Count all tables concurrently so startup costs ~1 round trip, not N
+    if configured_tables:
+        with ThreadPoolExecutor(max_workers=min(16, len(configured_tables))) as executor:
+            futures = {
+                executor.submit(count_records, table_name): table_name
+                for table_name in configured_tables
+            }
+            for future in as_completed(futures):
+                table_name = futures[future]
+                try:
+                    count = future.result()
+                    print(f"  ✅ {table_name}: {count} records")
+                except Exception as e:
+                    print(f"  ❌ {table_name}: Error - {str(e)}")
+                    all_accessible = False
 
     print("="*60 + "\n")
 
@@ -271,7 +303,107 @@ def verify_teable_tables():
     print("✅ All Teable tables are accessible!\n")
 
 
+
+def create_app():
+    """Build the Flask app, importing blueprints only once it exists."""
+    # A missing SECRET_KEY or malformed integer setting can't be run with;
+    # report every config problem at once rather than failing on the first
+    if _startup_errors:
+        validate_config()
+
+    from flask_wtf.csrf import CSRFProtect
+    from utils.censoring import register_censoring_filters
+    from utils.rate_limiter import rate_limit_api_key
+    from utils.expiry_sweeper import start_expiry_sweeper
+    from routes.auth import auth_bp, oauth_bp
+    from routes.admin import admin_bp
+    # from routes.admin_database import admin_database_bp  # DEPRECATED: Database swap feature obsolete with Teable migration
+    from routes.opt_out import opt_out_bp
+    from routes.api import api_bp
+    from routes.event_admin import event_admin_bp
+
+    app = Flask(__name__)
+    app.secret_key = SECRET_KEY
+
+    # Configure secure session cookies
+    app.config.update(
+        SESSION_COOKIE_SECURE=PROD,  # Only send over HTTPS in production
+        SESSION_COOKIE_HTTPONLY=True,  # Prevent XSS access to cookies
+        SESSION_COOKIE_SAMESITE="Lax",  # CSRF protection
+        PERMANENT_SESSION_LIFETIME=3600,  # 1 hour session timeout
+    )
+
+    # Register censoring filters for templates
+    register_censoring_filters(app)
+
+    # Registered ahead of CSRFProtect so CSRF error pages still get a nonce
+    app.before_request(set_csp_nonce)
+
+    # Initialize CSRF protection
+    csrf = CSRFProtect(app)
+
+    # Started lazily so the thread lives in the worker, not a preforked parent
+    app.before_request(start_expiry_sweeper)
+    app.context_processor(inject_posthog)
+    app.after_request(add_security_headers)
+
+    # Initialize rate limiter (disabled in development)
+    if not DEBUG_MODE:
+        from flask_limiter import Limiter
+        from flask_limiter.util import get_remote_address
+
+        limiter = Limiter(
+            app=app,
+            key_func=get_remote_address,
+            default_limits=["200 per day", "50 per hour"],
+            # Shared Redis storage so limits hold across Gunicorn workers.
+            # Fixed-window is a single INCR+EXPIRE per hit (no Lua scripts).
+            storage_uri=RATELIMIT_STORAGE_URI,
+            strategy="fixed-window",
+            in_memory_fallback_enabled=True,
+        )
+
+        # Apply stricter rate limits to auth endpoints
+        limiter.limit("5 per minute")(auth_bp)
+    else:
+        # No rate limiting in development mode
+        print("DEBUG: Rate limiting disabled in development mode")
+
+    # Register blueprints
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(admin_bp)
+    # app.register_blueprint(admin_database_bp)  # DEPRECATED: Database swap feature obsolete with Teable
+    app.register_blueprint(opt_out_bp)
+
+    # Admin routes keep CSRF protection for security
+
+    app.register_blueprint(api_bp)
+
+    # Exempt API endpoints from CSRF protection (they use API key auth)
+    csrf.exempt(api_bp)
+
+    # Register OAuth 2.0 blueprint and exempt from CSRF (uses client_secret auth)
+    app.register_blueprint(oauth_bp)
+    csrf.exempt(oauth_bp)
+
+    app.register_blueprint(event_admin_bp)
+
+    app.add_url_rule("/health", view_func=health_check, methods=["GET"])
+    app.add_url_rule(
+        "/api/test",
+        view_func=require_api_key(["users.read"])(rate_limit_api_key(api_test)),
+        methods=["GET"],
+    )
+
+    return app
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
+    from utils.db_init import init_db, check_table_exists, list_all_tables
+
     # Print debug information
     print_debug_info()
 
@@ -289,10 +421,8 @@ if __name__ == "__main__":
         list_all_tables()
         check_table_exists("oauth_tokens")
 
-    # Start rate limiter cleanup thread (only in production)
     if not DEBUG_MODE:
-        start_cleanup_thread()
+        # app.run() is Flask's development server and uses a single process
+        print("Warning: Running the development server; use `gunicorn app:app` in production")
 
-    # Determine port based on environment
-    port = int(os.getenv("PORT", 3000))
-    app.run(debug=DEBUG_MODE, port=port, host="0.0.0.0")
+    app.run(debug=DEBUG_MODE, port=PORT, host="0.0.0.0")
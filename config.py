@@ -3,15 +3,29 @@
 import os
 from dotenv import load_dotenv
 
-# Try to load .env file explicitly
-if os.path.exists(".env"):
-    print("DEBUG: .env file found")
+# Try to load .env file explicitly (reported by print_debug_info)
+ENV_FILE_FOUND = os.path.exists(".env")
+if ENV_FILE_FOUND:
     load_dotenv(".env")
-    print("DEBUG: Explicitly loaded .env file")
 else:
-    print("DEBUG: .env file NOT found")
     load_dotenv()  # Try default loading
 
+# Problems found while reading the environment (malformed values, missing
+# SECRET_KEY). They're reported together with validate_config()'s checks so
+# one run shows every issue.
+_startup_errors = []
+
+
+def _int_env(name, default):
+    """Read an integer environment variable, recording an error if malformed."""
+    raw = os.getenv(name, default)
+    try:
+        return int(raw)
+    except ValueError:
+        _startup_errors.append(f"{name} must be an integer (got {raw!r})")
+        return int(default)
+
+
 # Environment configuration
 PROD = os.getenv("PROD", "").upper() == "TRUE"
 DEBUG_MODE = not PROD
@@ -22,15 +36,16 @@ if PROD:
 else:
     BASE_URL = "http://127.0.0.1:3000"
 
+# Port for the development server (app.py run directly)
+PORT = _int_env("PORT", "3000")
+
 # Flask configuration
 SECRET_KEY = os.getenv("SECRET_KEY")
 if not SECRET_KEY:
-    print("CRITICAL ERROR: SECRET_KEY environment variable is not set!")
-    print("Please set a strong, random SECRET_KEY in your .env file.")
-    print(
-        "You can generate one with: python -c 'import secrets; print(secrets.token_hex(32))'"
+    _startup_errors.append(
+        "SECRET_KEY not set (generate one with: "
+        "python -c 'import secrets; print(secrets.token_hex(32))')"
     )
-    exit(1)
 
 # WorkOS Configuration
 WORKOS_API_KEY = os.getenv("WORKOS_API_KEY")
@@ -42,7 +57,7 @@ EMAIL_REDIRECT_URI = f"{BASE_URL}/auth/email/callback"
 
 # AWS SES SMTP configuration
 MAIL_HOST = os.getenv("MAIL_HOST", "email-smtp.us-west-1.amazonaws.com")
-MAIL_PORT = int(os.getenv("MAIL_PORT", "587"))
+MAIL_PORT = _int_env("MAIL_PORT", "587")
 MAIL_USERNAME = os.getenv("MAIL_USERNAME")
 MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
 EMAIL_SENDER = os.getenv("EMAIL_SENDER", "adam@hack.sv")
@@ -50,7 +65,9 @@ EMAIL_SENDER_NAME = os.getenv("EMAIL_SENDER_NAME", "Adam Xu")
 
 # Discord configuration
 DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
-DISCORD_GUILD_ID = int(os.getenv("DISCORD_GUILD_ID", "0"))
+DISCORD_GUILD_ID = _int_env("DISCORD_GUILD_ID", "0")
+# API key the Discord bot sends when calling this app's /api/discord endpoints
+DISCORD_BOT_API_KEY = os.getenv("API_KEY")
 
 # PostHog Configuration
 POSTHOG_API_KEY = os.getenv("POSTHOG_API_KEY")
@@ -65,6 +82,10 @@ LISTMONK_ENABLED = os.getenv("LISTMONK_ENABLED", "true").lower() == "true" and L
 # Database configuration
 DATABASE = "users.db"
 
+# Redis configuration (shared rate-limit counters across workers)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+RATELIMIT_STORAGE_URI = "memory://" if DEBUG_MODE else REDIS_URL
+
 # Teable configuration
 TEABLE_API_URL = os.getenv('TEABLE_API_URL', 'https://app.teable.ai/api')
 TEABLE_ACCESS_TOKEN = os.getenv('TEABLE_ACCESS_TOKEN')
@@ -76,36 +97,84 @@ TEABLE_TABLE_API_KEYS = os.getenv('TEABLE_TABLE_API_KEYS')
 TEABLE_TABLE_APPS = os.getenv('TEABLE_TABLE_APPS')
 
 
+# Settings listed by print_debug_info, in order. Credentials and IDs in
+# _MASKED_SETTINGS only report whether they're set.
+_DEBUG_SETTINGS = (
+    "PROD",
+    "DEBUG_MODE",
+    "BASE_URL",
+    "WORKOS_API_KEY",
+    "WORKOS_CLIENT_ID",
+    "SECRET_KEY",
+    "MAIL_HOST",
+    "MAIL_PORT",
+    "MAIL_USERNAME",
+    "MAIL_PASSWORD",
+    "DISCORD_BOT_TOKEN",
+    "RATELIMIT_STORAGE_URI",
+    "GOOGLE_REDIRECT_URI",
+    "EMAIL_REDIRECT_URI",
+    "TEABLE_ACCESS_TOKEN",
+    "TEABLE_BASE_ID",
+    "TEABLE_TABLE_USERS",
+    "TEABLE_TABLE_ADMINS",
+    "TEABLE_TABLE_ADMIN_PERMISSIONS",
+    "TEABLE_TABLE_API_KEYS",
+    "TEABLE_TABLE_APPS",
+)
+_MASKED_SETTINGS = frozenset({
+    "WORKOS_API_KEY",
+    "WORKOS_CLIENT_ID",
+    "SECRET_KEY",
+    "MAIL_USERNAME",
+    "MAIL_PASSWORD",
+    "DISCORD_BOT_TOKEN",
+    "TEABLE_ACCESS_TOKEN",
+    "TEABLE_BASE_ID",
+    "TEABLE_TABLE_USERS",
+    "TEABLE_TABLE_ADMINS",
+    "TEABLE_TABLE_ADMIN_PERMISSIONS",
+    "TEABLE_TABLE_API_KEYS",
+    "TEABLE_TABLE_APPS",
+})
+
+
 def print_debug_info():
     """Print debug information about environment variables."""
-    if DEBUG_MODE:
-        print("=== ENVIRONMENT VARIABLES DEBUG ===")
-        print(f"PROD: {PROD}")
-        print(f"DEBUG_MODE: {DEBUG_MODE}")
-        print(f"BASE_URL: {BASE_URL}")
-        print(f"WORKOS_API_KEY: {'[SET]' if WORKOS_API_KEY else '[NOT SET]'}")
-        print(f"WORKOS_CLIENT_ID: {'[SET]' if WORKOS_CLIENT_ID else '[NOT SET]'}")
-        print(f"SECRET_KEY: {'[SET]' if SECRET_KEY else '[NOT SET]'}")
-        print(f"MAIL_HOST: {MAIL_HOST}")
-        print(f"MAIL_PORT: {MAIL_PORT}")
-        print(f"MAIL_USERNAME: {'[SET]' if MAIL_USERNAME else '[NOT SET]'}")
-        print(f"MAIL_PASSWORD: {'[SET]' if MAIL_PASSWORD else '[NOT SET]'}")
-        print(f"DISCORD_BOT_TOKEN: {'[SET]' if DISCORD_BOT_TOKEN else '[NOT SET]'}")
-        print(f"GOOGLE_REDIRECT_URI: {GOOGLE_REDIRECT_URI}")
-        print(f"EMAIL_REDIRECT_URI: {EMAIL_REDIRECT_URI}")
-        print(f"TEABLE_ACCESS_TOKEN: {'[SET]' if TEABLE_ACCESS_TOKEN else '[NOT SET]'}")
-        print(f"TEABLE_BASE_ID: {'[SET]' if TEABLE_BASE_ID else '[NOT SET]'}")
-        print(f"TEABLE_TABLE_USERS: {'[SET]' if TEABLE_TABLE_USERS else '[NOT SET]'}")
-        print(f"TEABLE_TABLE_ADMINS: {'[SET]' if TEABLE_TABLE_ADMINS else '[NOT SET]'}")
-        print(f"TEABLE_TABLE_ADMIN_PERMISSIONS: {'[SET]' if TEABLE_TABLE_ADMIN_PERMISSIONS else '[NOT SET]'}")
-        print(f"TEABLE_TABLE_API_KEYS: {'[SET]' if TEABLE_TABLE_API_KEYS else '[NOT SET]'}")
-        print(f"TEABLE_TABLE_APPS: {'[SET]' if TEABLE_TABLE_APPS else '[NOT SET]'}")
-        print("===================================")
+    if not DEBUG_MODE:
+        return
+
+    settings = globals()
+    lines = ["=== ENVIRONMENT VARIABLES DEBUG ==="]
+    lines.append(f".env file: {'loaded' if ENV_FILE_FOUND else 'NOT found'}")
+    for name in _DEBUG_SETTINGS:
+        value = settings[name]
+        if name in _MASKED_SETTINGS:
+            value = "[SET]" if value else "[NOT SET]"
+        lines.append(f"{name}: {value}")
+    lines.append("===================================")
+
+    # One write for the whole block instead of one per line
+    print("\n".join(lines))
+
+
+def _exit_with_config_errors(errors, hints=()):
+    """Print every configuration error in one banner and exit."""
+    print("\n" + "="*60)
+    print("❌ CONFIGURATION ERRORS DETECTED")
+    print("="*60)
+    for error in errors:
+        print(f"  • {error}")
+    print("\nPlease check your .env file and ensure all required variables are set.")
+    for hint in hints:
+        print(hint)
+    print("="*60 + "\n")
+    exit(1)
 
 
 def validate_config():
     """Validate that required configuration is present."""
-    errors = []
+    errors = list(_startup_errors)
 
     # Check WorkOS configuration
     if not WORKOS_API_KEY or not WORKOS_CLIENT_ID:
@@ -131,14 +200,31 @@ def validate_config():
             errors.append(f"{table_var} not set")
 
     if errors:
-        print("\n" + "="*60)
-        print("❌ CONFIGURATION ERRORS DETECTED")
-        print("="*60)
-        for error in errors:
-            print(f"  • {error}")
-        print("\nPlease check your .env file and ensure all required variables are set.")
-        print("\nFor Teable setup:")
-        print("  1. Run: python teable_setup.py")
-        print("  2. Add the table IDs it outputs to your .env file")
-        print("="*60 + "\n")
-        exit(1)
+        _exit_with_config_errors(
+            errors,
+            hints=(
+                "\nFor Teable setup:",
+                "  1. Run: python teable_setup.py",
+                "  2. Add the table IDs it outputs to your .env file",
+            ),
+        )
+
+
+def validate_discord_bot_config():
+    """Validate the settings discord_bot.py needs (SECRET_KEY isn't one)."""
+    errors = [error for error in _startup_errors if not error.startswith("SECRET_KEY")]
+
+    if not DISCORD_BOT_TOKEN:
+        errors.append("DISCORD_BOT_TOKEN not set")
+    # A malformed value is already reported above and reads back as 0
+    if not DISCORD_GUILD_ID and not any(
+        error.startswith("DISCORD_GUILD_ID") for error in errors
+    ):
+        errors.append("DISCORD_GUILD_ID not set")
+    if errors:
+        _exit_with_config_errors(errors)
+
+    # The bot still runs without it (docker-compose doesn't pass one); only
+    # commands that call the hack.sv API fail
+    if not DISCORD_BOT_API_KEY:
+        print("Warning: API_KEY not set (the bot's hack.sv API key); API calls will fail")
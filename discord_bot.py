@@ -4,41 +4,43 @@ Discord bot for handling verification commands and role assignment.
 """
 
 import os
-import json
-import asyncio
-import requests
-from datetime import datetime, timedelta
-import pytz
+import aiohttp
+import msgspec
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo
 import discord
 from discord.ext import tasks
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Environment configuration
-PROD = os.getenv("PROD", "").upper() == "TRUE"
-DEBUG_MODE = not PROD
-
-# Base URL configuration
-if PROD:
-    BASE_URL = "https://id.hack.sv"
-else:
-    BASE_URL = "http://127.0.0.1:3000"
-
-# Configuration
-DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
-DISCORD_GUILD_ID = int(os.getenv("DISCORD_GUILD_ID", "0"))
-API_KEY = os.getenv("API_KEY")
+from utils.cache import TTLCache
+
+# config.py loads .env and reads the environment once for both the app and the bot
+from config import (
+    PROD,
+    DEBUG_MODE,
+    BASE_URL,
+    DISCORD_BOT_TOKEN,
+    DISCORD_GUILD_ID,
+    DISCORD_BOT_API_KEY as API_KEY,
+    validate_discord_bot_config,
+)
 
 # Debug environment variables
-print(f"DEBUG: DISCORD_BOT_TOKEN set: {bool(DISCORD_BOT_TOKEN)}")
-print(f"DEBUG: API_KEY set: {bool(API_KEY)}")
+if DEBUG_MODE:
+    print(f"DEBUG: DISCORD_BOT_TOKEN set: {bool(DISCORD_BOT_TOKEN)}")
+    print(f"DEBUG: API_KEY set: {bool(API_KEY)}")
 
 
 # Countdown configuration
 COUNTDOWN_CHANNEL_ID = 1398862467341352990
 TARGET_DATE = datetime(2025, 8, 23, 8, 0, 0)  # August 23, 2025 at 8:00 AM PST
+# Resolved once rather than on every countdown run. zoneinfo tzinfos follow
+# DST when attached directly (pytz's need localize()), which the wall-clock
+# task schedule below relies on; python:slim ships the system tz database.
+PST = ZoneInfo("America/Los_Angeles")
+TARGET_PST = TARGET_DATE.replace(tzinfo=PST)
+COUNTDOWN_TIME = time(8, 0, tzinfo=PST)
+# Pacific date of the last countdown sent, kept on disk (data/ is a volume in
+# Docker) so a restart after 8 AM sends the missed message exactly once
+COUNTDOWN_STATE_FILE = os.path.join("data", "last_countdown_date")
 
 # Bot setup
 intents = discord.Intents.default()
@@ -51,88 +53,104 @@ event_name_mapping = {
     "scrapyard": "<:scrapyard:1320732117272891392> Scrapyard Silicon Valley",
 }
 
+# /verify embeds, built once. The prompt is identical for everyone and is only
+# serialized, never mutated; the already-verified one is copied per user.
+_VERIFY_PROMPT_EMBED = discord.Embed(
+    title="🔐 Discord Verification",
+    description="Click the button below to verify! It expires in 10 minutes.",
+    color=discord.Color.blue(),
+)
+_ALREADY_VERIFIED_EMBED = discord.Embed(
+    title="✅ Already Verified", color=discord.Color.green()
+)
+
 
 # Removed database connection - Discord bot should use API only
 
 
-def generate_verification_token(length=32):
-    """Generate a random verification token."""
-    import random
-    import string
+# Calls to the hack.sv API share one aiohttp session (and its keep-alive
+# connection pool) so they never block the bot's event loop
+API_TIMEOUT = aiohttp.ClientTimeout(total=10)  # seconds
+_api_session = None
+
+# API bodies go through msgspec's C JSON codec instead of the stdlib json module
+_json_encode = msgspec.json.encode
+_json_decode = msgspec.json.decode
+
+
+def _dumps(obj):
+    """Serialize a request body to JSON text for aiohttp."""
+    return _json_encode(obj).decode()
+
 
-    return "".join(random.choices(string.ascii_letters + string.digits, k=length))
+def get_api_session():
+    """Return the shared API session, creating it on the bot's event loop."""
+    global _api_session
+
+    if _api_session is None or _api_session.closed:
+        _api_session = aiohttp.ClientSession(
+            headers={"Authorization": f"Bearer {API_KEY}"},
+            timeout=API_TIMEOUT,
+            json_serialize=_dumps,
+        )
+    return _api_session
 
 
-def save_verification_token(discord_id, discord_username, message_id=None):
+async def save_verification_token(discord_id, discord_username, message_id=None):
     """Save verification token via API."""
     try:
         if not API_KEY:
             print("ERROR: API_KEY is not set!")
             return None
-        headers = {
-            "Authorization": f"Bearer {API_KEY}",
-            "Content-Type": "application/json",
-        }
         data = {
             "discord_id": str(discord_id),
             "discord_username": discord_username,
             "message_id": message_id,
         }
 
-        response = requests.post(
-            f"{BASE_URL}/api/discord/verification-token", headers=headers, json=data
-        )
-
-        if response.status_code == 200:
-            result = response.json()
-            return result.get("token")
-        else:
-            print(f"Failed to create verification token: {response.status_code}")
-            print(f"Response: {response.text}")
-            return None
+        async with get_api_session().post(
+            f"{BASE_URL}/api/discord/verification-token", json=data
+        ) as response:
+            if response.status == 200:
+                result = await response.json(loads=_json_decode)
+                return result.get("token")
+            else:
+                print(f"Failed to create verification token: {response.status}")
+                print(f"Response: {await response.text()}")
+                return None
     except Exception as e:
         print(f"Error creating verification token: {e}")
         return None
 
 
-def get_user_by_discord_id(discord_id):
-    """Get user by Discord ID via API."""
-    try:
-        headers = {"Authorization": f"Bearer {API_KEY}"}
-        response = requests.get(
-            f"{BASE_URL}/api/discord/user/{discord_id}", headers=headers
-        )
+# Linked users, keyed by Discord ID. Admin commands and repeated slash
+# commands tend to look up the same user within seconds. Misses aren't cached
+# so a freshly linked account shows up immediately.
+DISCORD_USER_CACHE_TTL = 15  # seconds
+_discord_user_cache = TTLCache(maxsize=4096, ttl=DISCORD_USER_CACHE_TTL)
 
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("user") if data.get("success") else None
-        else:
-            return None
-    except Exception as e:
-        print(f"Error fetching user by Discord ID: {e}")
-        return None
 
+async def get_user_by_discord_id(discord_id):
+    """Get user by Discord ID via API."""
+    user = _discord_user_cache.get(discord_id)
+    if user is not None:
+        return user
 
-def assign_roles_to_user(member, events):
-    """Assign Discord roles based on user's events."""
-    # Load role mappings from events.json
     try:
-        from utils.events import get_all_events
-
-        all_events = get_all_events()
+        async with get_api_session().get(
+            f"{BASE_URL}/api/discord/user/{discord_id}"
+        ) as response:
+            if response.status == 200:
+                data = await response.json(loads=_json_decode)
+                user = data.get("user") if data.get("success") else None
+                if user:
+                    _discord_user_cache.set(discord_id, user)
+                return user
+            else:
+                return None
     except Exception as e:
-        print(f"Failed to load events configuration: {e}")
-        return []
-
-    roles_to_assign = []
-    for event in events:
-        if event in all_events and "discord-role-id" in all_events[event]:
-            role_id = all_events[event]["discord-role-id"]
-            role = member.guild.get_role(role_id)
-            if role:
-                roles_to_assign.append(role)
-
-    return roles_to_assign
+        print(f"Error fetching user by Discord ID: {e}")
+        return None
 
 
 @bot.event
@@ -148,14 +166,13 @@ async def on_ready():
         print(f"BASE_URL: {BASE_URL}")
         print("=================================")
 
-    # Start the cleanup task
-    cleanup_expired_tokens.start()
+    # Start the daily countdown task (on_ready fires again after a reconnect)
+    if not daily_countdown.is_running():
+        daily_countdown.start()
 
-    # Start the verification check task
-    check_for_new_verifications.start()
-
-    # Start the daily countdown task
-    daily_countdown.start()
+        # Catch up if the bot was down at 8:00 AM today
+        if datetime.now(PST).timetz() >= COUNTDOWN_TIME:
+            await daily_countdown()
 
 
 @bot.slash_command(
@@ -167,7 +184,7 @@ async def verify(ctx):
     discord_username = str(ctx.author)
 
     # Check if user is already verified
-    user = get_user_by_discord_id(discord_id)
+    user = await get_user_by_discord_id(discord_id)
     if user:
         preferred_name = user["preferred_name"] or user["legal_name"] or "User"
 
@@ -179,30 +196,20 @@ async def verify(ctx):
                 [f"* {event_name_mapping.get(event, event)}" for event in events]
             )
 
-        embed = discord.Embed(
-            title="✅ Already Verified",
-            description=f"You're already verified as **{preferred_name}** ({user['email']}).{events_list}\n\nDM an organizer if you need to switch your registered email address.",
-            color=discord.Color.green(),
-        )
+        embed = _ALREADY_VERIFIED_EMBED.copy()
+        embed.description = f"You're already verified as **{preferred_name}** ({user['email']}).{events_list}\n\nDM an organizer if you need to switch your registered email address."
         await ctx.respond(embed=embed, ephemeral=True)
         return
 
     # Generate verification token and save to database
-    token = save_verification_token(discord_id, discord_username)
+    token = await save_verification_token(discord_id, discord_username)
     verification_url = f"{BASE_URL}/verify?token={token}"
 
-    # Create embed with verification button
-    embed = discord.Embed(
-        title="🔐 Discord Verification",
-        description="Click the button below to verify! It expires in 10 minutes.",
-        color=discord.Color.blue(),
-    )
-
     # Create view with link button
     view = VerificationView(verification_url)
 
     # Send ephemeral response
-    await ctx.respond(embed=embed, view=view, ephemeral=True)
+    await ctx.respond(embed=_VERIFY_PROMPT_EMBED, view=view, ephemeral=True)
 
 
 @bot.slash_command(
@@ -223,7 +230,7 @@ async def unlink(ctx):
         discord_id = str(ctx.author.id)
 
         # Check if user has a linked account first
-        user = get_user_by_discord_id(discord_id)
+        user = await get_user_by_discord_id(discord_id)
         if not user:
             await ctx.respond(
                 "❌ Your Discord account is not linked to any hack.sv account.",
@@ -231,19 +238,23 @@ async def unlink(ctx):
             )
             return
 
+        # The cached link is about to go stale, whatever the API answers
+        _discord_user_cache.pop(discord_id)
+
         # Call API to unlink the account
-        headers = {
-            "Authorization": f"Bearer {API_KEY}",
-            "Content-Type": "application/json",
-        }
         data = {"discord_id": discord_id}
 
-        response = requests.post(
-            f"{BASE_URL}/api/discord/unlink", headers=headers, json=data
-        )
+        async with get_api_session().post(
+            f"{BASE_URL}/api/discord/unlink", json=data
+        ) as response:
+            status = response.status
+            result = (
+                await response.json(loads=_json_decode)
+                if response.content_type == "application/json"
+                else {}
+            )
 
-        if response.status_code == 200:
-            result = response.json()
+        if status == 200:
 
             # Build role removal message
             role_message = ""
@@ -268,12 +279,7 @@ async def unlink(ctx):
                 ephemeral=True,
             )
         else:
-            error_data = (
-                response.json()
-                if response.headers.get("content-type") == "application/json"
-                else {}
-            )
-            error_message = error_data.get("error", "Unknown error occurred")
+            error_message = result.get("error", "Unknown error occurred")
             await ctx.respond(
                 f"❌ **Failed to unlink Discord account**\n\n"
                 f"Error: {error_message}\n\n"
@@ -294,7 +300,7 @@ async def is_admin_check(ctx):
     """Check if the user is an admin."""
     try:
         # Get user from database by Discord ID
-        user = get_user_by_discord_id(str(ctx.author.id))
+        user = await get_user_by_discord_id(str(ctx.author.id))
         if not user:
             return False
 
@@ -316,8 +322,8 @@ async def user_info(ctx, user):
         return
 
     try:
-        # Get user data from database
-        target_user = get_user_by_discord_id(str(user.id))
+        # Get user data from the API only once the invoker is known to be an admin
+        target_user = await get_user_by_discord_id(str(user.id))
 
         if not target_user:
             await ctx.respond(
@@ -334,45 +340,31 @@ async def user_info(ctx, user):
         # API returns events as a list, no need to parse JSON
         events_str = ", ".join(events_list) if events_list else "None"
 
+        def show(value):
+            # Profile values are user-supplied, so keep them from rendering as markdown
+            return discord.utils.escape_markdown(str(value)) if value else "N/A"
+
+        # Profile details go in one description block; only the events list
+        # and admin status stay as separate fields
+        description = "\n".join((
+            f"**📧 Email:** {show(target_user['email'])}",
+            f"**📝 Legal Name:** {show(target_user['legal_name'])}",
+            f"**✨ Preferred Name:** {show(target_user['preferred_name'])}",
+            f"**🏷️ Pronouns:** {show(target_user['pronouns'])}",
+            f"**🎂 Date of Birth:** {show(target_user.get('dob'))}",
+            f"**🎮 Discord ID:** {show(target_user['discord_id'])}",
+            f"**🆔 User ID:** {show(target_user['id'])}",
+            "**✅ Verified:** Yes (Discord linked)",
+        ))
+
         # Create embed with user information
         embed = discord.Embed(
             title=f"👤 User Information: {user.display_name}",
+            description=description,
             color=discord.Color.blue(),
             timestamp=datetime.now(),
         )
 
-        embed.add_field(
-            name="📧 Email", value=target_user["email"] or "N/A", inline=True
-        )
-
-        embed.add_field(
-            name="📝 Legal Name",
-            value=target_user["legal_name"] or "N/A",
-            inline=True,
-        )
-
-        embed.add_field(
-            name="✨ Preferred Name",
-            value=target_user["preferred_name"] or "N/A",
-            inline=True,
-        )
-
-        embed.add_field(
-            name="🏷️ Pronouns", value=target_user["pronouns"] or "N/A", inline=True
-        )
-
-        embed.add_field(
-            name="🎂 Date of Birth",
-            value=target_user.get("dob") or "N/A",
-            inline=True,
-        )
-
-        embed.add_field(
-            name="🎮 Discord ID",
-            value=target_user["discord_id"] or "N/A",
-            inline=True,
-        )
-
         embed.add_field(name="🎪 Events", value=events_str, inline=False)
 
         embed.add_field(
@@ -381,12 +373,6 @@ async def user_info(ctx, user):
             inline=True,
         )
 
-        embed.add_field(
-            name="🆔 User ID", value=str(target_user["id"]) or "N/A", inline=True
-        )
-
-        embed.add_field(name="✅ Verified", value="Yes (Discord linked)", inline=True)
-
         embed.set_footer(text=f"Requested by {ctx.author.display_name}")
         embed.set_thumbnail(url=user.display_avatar.url)
 
@@ -417,37 +403,37 @@ class VerificationView(discord.ui.View):
         )
 
 
-@tasks.loop(minutes=5)
-async def cleanup_expired_tokens():
-    """Clean up expired verification tokens via API."""
-    # This should be handled by the Flask app, not the Discord bot
-    # The Discord bot shouldn't manage database cleanup
-    pass
+def load_last_countdown_date():
+    """Return the Pacific date of the last countdown sent, or None."""
+    try:
+        with open(COUNTDOWN_STATE_FILE) as f:
+            return date.fromisoformat(f.read().strip())
+    except (OSError, ValueError):
+        return None
 
 
-@tasks.loop(seconds=30)
-async def check_for_new_verifications():
-    """Check for newly verified users and assign roles."""
+def save_last_countdown_date(day):
+    """Record that today's countdown was sent."""
     try:
-        # This functionality should be handled by the Flask app or triggered by webhooks
-        # The Discord bot shouldn't poll the database for role assignments
-        return
-
-    except Exception as e:
-        print(f"Error in check_for_new_verifications: {e}")
+        os.makedirs(os.path.dirname(COUNTDOWN_STATE_FILE), exist_ok=True)
+        with open(COUNTDOWN_STATE_FILE, "w") as f:
+            f.write(day.isoformat())
+    except OSError as e:
+        print(f"Warning: Failed to record countdown date: {e}")
 
 
-@tasks.loop(hours=24)
+# Scheduled by wall-clock time, so it fires at 8:00 AM Pacific on both sides
+# of a DST change instead of drifting with a fixed 24-hour interval
+@tasks.loop(time=COUNTDOWN_TIME)
 async def daily_countdown():
     """Send daily countdown message at 8:00 AM PST."""
     try:
-        # Get PST timezone
-        pst = pytz.timezone("US/Pacific")
-        now_pst = datetime.now(pst)
+        today_pst = datetime.now(PST).date()
+        if load_last_countdown_date() == today_pst:
+            return
 
         # Calculate days remaining until August 23, 2025 at 8:00 AM PST
-        target_pst = pst.localize(TARGET_DATE)
-        days_remaining = (target_pst.date() - now_pst.date()).days
+        days_remaining = (TARGET_PST.date() - today_pst).days
 
         # Get the channel
         channel = bot.get_channel(COUNTDOWN_CHANNEL_ID)
@@ -458,42 +444,13 @@ async def daily_countdown():
         # Send the countdown message
         message = f"# Some number of days remain..."
         await channel.send(message)
+        save_last_countdown_date(today_pst)
         print(f"Sent countdown message: {days_remaining} days remaining")
 
     except Exception as e:
         print(f"Error in daily_countdown: {e}")
 
 
-@daily_countdown.before_loop
-async def before_daily_countdown():
-    """Wait until 8:00 AM PST to start the countdown loop."""
-    await bot.wait_until_ready()
-
-    # Get PST timezone
-    pst = pytz.timezone("US/Pacific")
-    now_pst = datetime.now(pst)
-
-    # Calculate next 8:00 AM PST
-    next_8am = now_pst.replace(hour=8, minute=0, second=0, microsecond=0)
-    if now_pst.hour >= 8:
-        # If it's already past 8 AM today, schedule for tomorrow
-        next_8am += timedelta(days=1)
-
-    # Calculate seconds to wait
-    wait_seconds = (next_8am - now_pst).total_seconds()
-    print(f"Waiting {wait_seconds} seconds until next 8:00 AM PST for countdown")
-
-    await asyncio.sleep(wait_seconds)
-
-
-@bot.event
-async def on_member_update(before, after):
-    """Handle member updates - check if verification was completed."""
-    # This will be triggered when roles are assigned
-    # We can use this to clean up verification messages if needed
-    pass
-
-
 if __name__ == "__main__":
     if DEBUG_MODE:
         print("=== DISCORD BOT STARTUP DEBUG ===")
@@ -503,39 +460,7 @@ if __name__ == "__main__":
         print(f"DISCORD_GUILD_ID: {DISCORD_GUILD_ID}")
         print("=================================")
 
-    if not DISCORD_BOT_TOKEN:
-        print("ERROR: DISCORD_BOT_TOKEN not found in environment variables!")
-        exit(1)
-
-    if not DISCORD_GUILD_ID:
-        print("ERROR: DISCORD_GUILD_ID not found in environment variables!")
-        exit(1)
+    validate_discord_bot_config()
 
     print("Starting Discord bot...")
     bot.run(DISCORD_BOT_TOKEN)
-
-
-def remove_user_roles(discord_id: str) -> list:
-    """
-    Remove all verification roles from a user.
-    Returns list of removed role names.
-
-    Note: This is a placeholder implementation. In production, you'd need
-    to implement actual Discord role removal through the bot's async context.
-    """
-    removed_roles = []
-
-    try:
-        # TODO: Implement actual Discord role removal
-        # This would require either:
-        # 1. A separate Discord bot command/API
-        # 2. Using asyncio to run async Discord operations
-        # 3. A queue system for Discord operations
-
-        print(f"Would remove Discord roles for user {discord_id}")
-        removed_roles = ["Verified", "Attendee"]  # Placeholder
-
-    except Exception as e:
-        print(f"Error removing Discord roles for {discord_id}: {e}")
-
-    return removed_roles
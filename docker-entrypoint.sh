@@ -23,5 +23,6 @@ print('Database initialization complete!')
 
 # Start Gunicorn
 echo "Starting Gunicorn..."
-exec gunicorn --workers 4 --bind 0.0.0.0:3000 --timeout 120 --access-logfile - --error-logfile - app:app
+# Worker, thread and logging settings live in gunicorn.conf.py
+exec gunicorn app:app
 
@@ -0,0 +1,24 @@
+"""Gunicorn settings shared by docker-entrypoint.sh and run_both.py."""
+
+import os
+import multiprocessing
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:3000")
+# One worker process per core by default
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+
+# Most request time is spent waiting on WorkOS, Teable and SMTP. Threaded
+# workers let one process keep several of those calls in flight instead of
+# pinning the whole worker to a single blocked request.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+
+# Import app.py once in the master and fork workers from it, so imports and
+# create_app() aren't repeated per worker and the loaded code is shared
+# copy-on-write. Nothing opens a SQLite connection or starts a thread at
+# import, and the connection pools and background threads are per-PID anyway.
+preload_app = True
+
+timeout = 120
+accesslog = "-"
+errorlog = "-"
@@ -3,16 +3,44 @@
 import json
 import secrets
 import hashlib
-from typing import Dict, List, Any, Optional
+import msgpack
+from typing import Dict, FrozenSet, List, Any, Optional
 from datetime import datetime
 from utils.teable import (
     create_record,
     get_records,
     update_record,
+    update_records_batch,
     delete_record,
     find_record_by_field
 )
-from utils.database import get_db_connection  # For api_key_logs (ephemeral)
+from utils.database import get_reader, get_writer  # For api_key_logs (ephemeral)
+from utils.cache import TTLCache
+
+# SQL for the api_key_logs hot paths, built once
+_INSERT_USAGE_LOG_SQL = (
+    "INSERT INTO api_key_logs (key_id, action, metadata) VALUES (?, ?, ?)"
+)
+_SELECT_KEY_LOGS_SQL = (
+    "SELECT * FROM api_key_logs WHERE key_id = ? ORDER BY timestamp DESC LIMIT ?"
+)
+_SELECT_ALL_LOGS_SQL = "SELECT * FROM api_key_logs ORDER BY timestamp DESC LIMIT ?"
+
+# Anything shorter can't be a key from generate_api_key(), so it is rejected
+# without a lookup
+MIN_API_KEY_LENGTH = 16
+
+# In-process cache of API key lookups used on the authenticated request path.
+# Entries are keyed by a digest of the key so raw keys never sit in memory.
+# invalidate_api_key_cache() only reaches the current worker, so the TTL is
+# how long a revoked or edited key can keep working in the others.
+API_KEY_CACHE_TTL = 5
+_api_key_cache = TTLCache(maxsize=10000, ttl=API_KEY_CACHE_TTL)
+
+# last_used_at is only written to Teable once per key per this many seconds;
+# busy keys would otherwise cost a Teable write on every usage batch
+LAST_USED_AT_RESOLUTION = 60
+_last_used_written = TTLCache(maxsize=10000, ttl=LAST_USED_AT_RESOLUTION)
 
 
 def generate_api_key(length=32):
@@ -20,6 +48,20 @@ def generate_api_key(length=32):
     return "hack.sv." + secrets.token_urlsafe(length)
 
 
+def _load_json_field(raw: Optional[str], empty_json: str):
+    """Decode a stored JSON field, skipping the parser for empty values."""
+    if not raw or raw == empty_json:
+        return [] if empty_json == "[]" else {}
+    return json.loads(raw)
+
+
+def _load_log_metadata(raw) -> Dict[str, Any]:
+    """Decode a usage log's metadata (msgpack BLOB, or JSON text from older rows)."""
+    if isinstance(raw, bytes):
+        return msgpack.unpackb(raw)
+    return _load_json_field(raw, "{}")
+
+
 def hash_api_key(api_key: str) -> str:
     """Hash an API key for storage/lookup."""
     return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
@@ -77,8 +119,8 @@ def get_api_key_by_key(api_key: str) -> Optional[Dict[str, Any]]:
             **record['fields']
         }
         key_dict.pop("key", None)  # never return the hash
-        key_dict["permissions"] = json.loads(key_dict.get("permissions", "[]"))
-        key_dict["metadata"] = json.loads(key_dict.get("metadata", "{}"))
+        key_dict["permissions"] = _load_json_field(key_dict.get("permissions"), "[]")
+        key_dict["metadata"] = _load_json_field(key_dict.get("metadata"), "{}")
         return key_dict
     return None
 
@@ -94,8 +136,8 @@ def get_all_api_keys() -> List[Dict[str, Any]]:
             **record['fields']
         }
         key_dict.pop("key", None)  # don't expose stored hashes
-        key_dict["permissions"] = json.loads(key_dict.get("permissions", "[]"))
-        key_dict["metadata"] = json.loads(key_dict.get("metadata", "{}"))
+        key_dict["permissions"] = _load_json_field(key_dict.get("permissions"), "[]")
+        key_dict["metadata"] = _load_json_field(key_dict.get("metadata"), "{}")
         keys_data.append(key_dict)
 
     # Sort by most recent first (if created_at exists)
@@ -103,17 +145,55 @@ def get_all_api_keys() -> List[Dict[str, Any]]:
     return keys_data
 
 
-def get_key_permissions(api_key: str) -> List[str]:
-    """Get permissions for an API key."""
+def _api_key_cache_key(api_key: str) -> bytes:
+    """Digest used to index the API key cache."""
+    return hashlib.blake2b(api_key.encode("utf-8"), digest_size=16).digest()
+
+
+def get_cached_api_key(api_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Get API key details, served from an in-process TTL cache when possible.
+    Only valid keys are cached; permissions are stored as a frozenset.
+    """
+    if not api_key:
+        return None
+
+    cache_key = _api_key_cache_key(api_key)
+    key_data = _api_key_cache.get(cache_key)
+    if key_data is not None:
+        return key_data
+
     key_data = get_api_key_by_key(api_key)
+    if not key_data:
+        return None
+
+    key_data["permissions"] = frozenset(key_data.get("permissions") or [])
+    _api_key_cache.set(cache_key, key_data)
+    return key_data
+
+
+def invalidate_api_key_cache(key_id: Optional[str] = None):
+    """
+    Drop this worker's cached lookups for an API key record, or everything if
+    no ID given. Other workers pick the change up within API_KEY_CACHE_TTL.
+    """
+    if key_id is None:
+        _api_key_cache.clear()
+    else:
+        _api_key_cache.discard_where(lambda key_data: key_data.get("id") == key_id)
+
+
+def get_key_permissions(api_key: str) -> FrozenSet[str]:
+    """Get permissions for an API key."""
+    key_data = get_cached_api_key(api_key)
     if key_data:
-        return key_data.get("permissions", [])
-    return []
+        return key_data["permissions"]
+    return frozenset()
 
 
 def get_key_rate_limit(api_key: str) -> int:
     """Get rate limit (RPM) for an API key."""
-    key_data = get_api_key_by_key(api_key)
+    key_data = get_cached_api_key(api_key)
     if key_data:
         return key_data.get("rate_limit_rpm", 60)
     return 60  # Default rate limit
@@ -137,11 +217,13 @@ def update_api_key(key_id: str, **kwargs):
 
     if update_data:
         update_record('api_keys', key_id, update_data)
+        invalidate_api_key_cache(key_id)
 
 
 def delete_api_key(key_id: str):
     """Delete API key by ID."""
     delete_record('api_keys', key_id)
+    invalidate_api_key_cache(key_id)
 
 
 def log_api_key_usage(api_key: str, action: str, metadata: Optional[Dict] = None):
@@ -149,55 +231,73 @@ def log_api_key_usage(api_key: str, action: str, metadata: Optional[Dict] = None
     Log API key usage to SQLite (ephemeral logs).
     Also updates last_used_at timestamp in Teable.
     """
-    # Get the key from Teable
-    key_data = get_api_key_by_key(api_key)
-    if not key_data:
-        return
+    log_api_key_usage_batch([(api_key, action, metadata)])
 
-    key_id = key_data['id']
 
-    # Update last_used_at in Teable
-    try:
-        current_timestamp = datetime.now().isoformat()
-        update_record('api_keys', key_id, {"last_used_at": current_timestamp})
-    except Exception as e:
-        print(f"Warning: Failed to update last_used_at: {e}")
+def log_api_key_usage_batch(entries: List[tuple]):
+    """
+    Log a batch of (api_key, action, metadata) usage entries.
+    Inserts all rows in one SQLite transaction and updates last_used_at in
+    Teable once per distinct key, at most every LAST_USED_AT_RESOLUTION seconds.
+    """
+    rows = []
+    used_key_ids = []
+    for api_key, action, metadata in entries:
+        # Get the key (cached lookup, shared with the auth decorator)
+        key_data = get_cached_api_key(api_key)
+        if not key_data:
+            continue
+
+        key_id = key_data['id']
+        # msgpack is about half the size of the equivalent JSON for these small,
+        # repetitive dicts, which keeps the log table and its WAL smaller
+        rows.append((key_id, action, msgpack.packb(metadata) if metadata else "{}"))
+        if key_id not in used_key_ids and _last_used_written.get(key_id) is None:
+            used_key_ids.append(key_id)
+
+    if not rows:
+        return
+
+    # Update last_used_at in Teable (skipping keys written recently)
+    if used_key_ids:
+        try:
+            current_timestamp = datetime.now().isoformat()
+            update_records_batch(
+                'api_keys',
+                [
+                    {"id": key_id, "fields": {"last_used_at": current_timestamp}}
+                    for key_id in used_key_ids
+                ],
+            )
+            for key_id in used_key_ids:
+                _last_used_written.set(key_id, True)
+        except Exception as e:
+            print(f"Warning: Failed to update last_used_at: {e}")
 
     # Log to SQLite (ephemeral)
-    conn = get_db_connection()
     try:
-        conn.execute(
-            "INSERT INTO api_key_logs (key_id, action, metadata) VALUES (?, ?, ?)",
-            (key_id, action, json.dumps(metadata or {})),
-        )
-        conn.commit()
+        with get_writer() as conn:
+            conn.executemany(_INSERT_USAGE_LOG_SQL, rows)
     except Exception as e:
         print(f"Warning: Failed to log API key usage: {e}")
-    finally:
-        conn.close()
 
 
-def get_api_key_logs(key_id: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
-    """Get API key usage logs from SQLite (ephemeral)."""
-    conn = get_db_connection()
+def get_api_key_logs(key_id: Optional[str] = None, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+    """Get API key usage logs from SQLite (ephemeral). A limit of None returns all logs."""
+    # SQLite treats a negative LIMIT as unbounded, so one statement serves both
+    if limit is None:
+        limit = -1
 
-    try:
+    with get_reader() as conn:
         if key_id:
-            logs = conn.execute(
-                "SELECT * FROM api_key_logs WHERE key_id = ? ORDER BY timestamp DESC LIMIT ?",
-                (key_id, limit),
-            ).fetchall()
+            logs = conn.execute(_SELECT_KEY_LOGS_SQL, (key_id, limit)).fetchall()
         else:
-            logs = conn.execute(
-                "SELECT * FROM api_key_logs ORDER BY timestamp DESC LIMIT ?", (limit,)
-            ).fetchall()
+            logs = conn.execute(_SELECT_ALL_LOGS_SQL, (limit,)).fetchall()
 
         logs_data = []
         for log in logs:
             log_dict = dict(log)
-            log_dict["metadata"] = json.loads(log_dict.get("metadata", "{}"))
+            log_dict["metadata"] = _load_log_metadata(log_dict.get("metadata"))
             logs_data.append(log_dict)
 
         return logs_data
-    finally:
-        conn.close()
@@ -1,83 +1,139 @@
 """Authentication models and utilities."""
 
+import math
+import time
 import secrets
-import string
 import sqlite3
-from datetime import datetime, timedelta
-from utils.database import get_db_connection
+from utils.database import get_reader, get_writer
+from utils.cache import TTLCache
+
+# Expiry times are INTEGER Unix epoch seconds computed by SQLite, so checks are
+# integer compares and no datetime objects are built on the auth path
+_NOW_EPOCH = "CAST(strftime('%s', 'now') AS INTEGER)"
+_EXPIRES_IN_10_MINUTES = f"{_NOW_EPOCH} + 600"
+
+# SQL for the verification hot paths, built once so every call hands the
+# connection's statement cache the same text
+_UPSERT_TOKEN_SQL = (
+    "INSERT INTO verification_tokens (token, discord_id, discord_username, message_id, expires_at) "
+    f"VALUES (?, ?, ?, ?, {_EXPIRES_IN_10_MINUTES}) "
+    "ON CONFLICT(discord_id) DO UPDATE SET token = excluded.token, "
+    "discord_username = excluded.discord_username, message_id = excluded.message_id, "
+    "expires_at = excluded.expires_at, used = FALSE"
+)
+_SELECT_VALID_TOKEN_SQL = (
+    "SELECT token, discord_id, discord_username, message_id, expires_at, used "
+    "FROM verification_tokens "
+    f"WHERE token = ? AND expires_at > {_NOW_EPOCH} AND used = FALSE"
+)
+_MARK_TOKEN_USED_SQL = "UPDATE verification_tokens SET used = TRUE WHERE token = ?"
+_RELEASE_TOKEN_SQL = "UPDATE verification_tokens SET used = FALSE WHERE token = ?"
+_CONSUME_TOKEN_SQL = (
+    "UPDATE verification_tokens SET used = TRUE "
+    f"WHERE token = ? AND expires_at > {_NOW_EPOCH} AND used = FALSE "
+    # complete_discord_verification only reads these two columns
+    "RETURNING discord_id, discord_username"
+)
+_UPSERT_CODE_SQL = (
+    f"INSERT INTO email_codes (email, code, expires_at) VALUES (?, ?, {_EXPIRES_IN_10_MINUTES}) "
+    "ON CONFLICT(email) DO UPDATE SET code = excluded.code, expires_at = excluded.expires_at"
+)
+_CONSUME_CODE_SQL = (
+    "DELETE FROM email_codes "
+    f"WHERE email = ? AND code = ? AND expires_at > {_NOW_EPOCH} RETURNING 1"
+)
+
+# The /verify page and the Discord bot look the same token up several times.
+# Valid rows are cached briefly; this process drops them when a token is used
+# or replaced, and other workers see at most VERIFICATION_TOKEN_CACHE_TTL
+# seconds of staleness. Linking itself always goes through
+# consume_verification_token, which checks the database.
+VERIFICATION_TOKEN_CACHE_TTL = 30  # seconds
+_verification_token_cache = TTLCache(maxsize=10000, ttl=VERIFICATION_TOKEN_CACHE_TTL)
 
 def generate_verification_code(length=6):
     """Generate a random verification code."""
-    return "".join(secrets.choice(string.digits) for _ in range(length))
+    # One CSPRNG draw, uniform over 000000..999999
+    return f"{secrets.randbelow(10 ** length):0{length}d}"
 
 def generate_verification_token(length=32):
-    """Generate a random verification token for Discord verification."""
-    alphabet = string.ascii_letters + string.digits
-    return "".join(secrets.choice(alphabet) for _ in range(length))
+    """Generate a random URL-safe verification token for Discord verification."""
+    # Base64 yields 4 characters per 3 random bytes; round the byte count up
+    # so every length gets enough characters, then trim to exactly length
+    return secrets.token_urlsafe(math.ceil(length * 3 / 4))[:length]
 
 def save_verification_token(discord_id, discord_username, message_id=None):
     """Save verification token to database with expiration time (10 minutes)."""
-    conn = get_db_connection()
     token = generate_verification_token()
-    expires_at = datetime.now() + timedelta(minutes=10)
-
-    # Delete any existing tokens for this discord user
-    conn.execute("DELETE FROM verification_tokens WHERE discord_id = ?", (discord_id,))
-
-    # Insert new token
-    conn.execute(
-        "INSERT INTO verification_tokens (token, discord_id, discord_username, message_id, expires_at) VALUES (?, ?, ?, ?, ?)",
-        (token, discord_id, discord_username, message_id, expires_at),
-    )
-    conn.commit()
-    conn.close()
+
+    # Replace any existing token for this discord user in a single statement
+    with get_writer() as conn:
+        conn.execute(_UPSERT_TOKEN_SQL, (token, discord_id, discord_username, message_id))
+
+    # The upsert replaced this user's previous token, if any
+    _verification_token_cache.discard_where(lambda row: row["discord_id"] == discord_id)
     return token
 
 def get_verification_token(token):
     """Get verification token info if valid and not expired."""
-    conn = get_db_connection()
-    result = conn.execute(
-        "SELECT * FROM verification_tokens WHERE token = ? AND expires_at > ? AND used = FALSE",
-        (token, datetime.now()),
-    ).fetchone()
-    conn.close()
-    return result
+    row = _verification_token_cache.get(token)
+    if row is not None:
+        if row["expires_at"] > time.time():
+            return row
+        _verification_token_cache.pop(token)
+        return None
+
+    with get_reader() as conn:
+        row = conn.execute(_SELECT_VALID_TOKEN_SQL, (token,)).fetchone()
+
+    if row is not None:
+        _verification_token_cache.set(token, row)
+    return row
 
 def mark_token_used(token):
     """Mark verification token as used."""
-    conn = get_db_connection()
-    conn.execute("UPDATE verification_tokens SET used = TRUE WHERE token = ?", (token,))
-    conn.commit()
-    conn.close()
+    _verification_token_cache.pop(token)
+    with get_writer() as conn:
+        conn.execute(_MARK_TOKEN_USED_SQL, (token,))
 
-def save_verification_code(email, code):
-    """Save verification code to database with expiration time (10 minutes)."""
-    conn = get_db_connection()
-    expires_at = datetime.now() + timedelta(minutes=10)
+def consume_verification_token(token):
+    """Atomically mark a valid, unused token as used and return its discord_id and
+    discord_username (or None)."""
+    _verification_token_cache.pop(token)
+    with get_writer() as conn:
+        return conn.execute(_CONSUME_TOKEN_SQL, (token,)).fetchone()
 
-    # Delete any existing code for this email
-    conn.execute("DELETE FROM email_codes WHERE email = ?", (email,))
+def release_verification_token(token):
+    """Undo consume_verification_token when the verification couldn't be completed."""
+    with get_writer() as conn:
+        conn.execute(_RELEASE_TOKEN_SQL, (token,))
 
-    # Insert new code
-    conn.execute(
-        "INSERT INTO email_codes (email, code, expires_at) VALUES (?, ?, ?)",
-        (email, code, expires_at),
-    )
-    conn.commit()
-    conn.close()
+
+# Email verification codes live only in the SQLite email_codes table, so every
+# worker sees the same state and nothing is held in process memory.
+def save_verification_code(email, code):
+    """Save verification code to database with expiration time (10 minutes)."""
+    # Replace any existing code for this email in a single statement
+    with get_writer() as conn:
+        conn.execute(_UPSERT_CODE_SQL, (email, code))
 
 def verify_code(email, code):
     """Verify if the code is valid and not expired."""
-    conn = get_db_connection()
-    result = conn.execute(
-        "SELECT * FROM email_codes WHERE email = ? AND code = ? AND expires_at > ?",
-        (email, code, datetime.now()),
-    ).fetchone()
-
-    if result:
-        # Delete the code after successful verification
-        conn.execute("DELETE FROM email_codes WHERE email = ?", (email,))
-        conn.commit()
-
-    conn.close()
+    # Check and consume in one statement so a code can only be used once
+    with get_writer() as conn:
+        result = conn.execute(_CONSUME_CODE_SQL, (email, code)).fetchone()
     return result is not None
+
+def cleanup_expired_email_codes() -> int:
+    """Delete expired email codes. Returns number of deleted rows."""
+    with get_writer() as conn:
+        return conn.execute(
+            f"DELETE FROM email_codes WHERE expires_at < {_NOW_EPOCH}"
+        ).rowcount
+
+def cleanup_expired_verification_tokens() -> int:
+    """Delete expired or used Discord verification tokens. Returns number of deleted rows."""
+    with get_writer() as conn:
+        return conn.execute(
+            f"DELETE FROM verification_tokens WHERE expires_at < {_NOW_EPOCH} OR used = TRUE"
+        ).rowcount
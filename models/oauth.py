@@ -3,8 +3,9 @@
 import secrets
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
-from utils.database import get_db_connection
+from utils.database import get_reader, get_writer
 from models.app import get_app_by_client_id, validate_redirect_uri
+from config import DEBUG_MODE
 import json
 
 
@@ -21,20 +22,17 @@ def create_authorization_code(
     code = secrets.token_urlsafe(32)
     expires_at = datetime.now() + timedelta(minutes=10)
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        """
-        INSERT INTO authorization_codes 
-        (code, client_id, user_email, redirect_uri, scope, expires_at, used)
-        VALUES (?, ?, ?, ?, ?, ?, FALSE)
-        """,
-        (code, client_id, user_email, redirect_uri, scope, expires_at)
-    )
-    
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            INSERT INTO authorization_codes 
+            (code, client_id, user_email, redirect_uri, scope, expires_at, used)
+            VALUES (?, ?, ?, ?, ?, ?, FALSE)
+            """,
+            (code, client_id, user_email, redirect_uri, scope, expires_at)
+        )
     
     return code
 
@@ -48,27 +46,23 @@ def verify_authorization_code(
     Verify authorization code and return associated data.
     Returns None if code is invalid, expired, or already used.
     """
-    from config import DEBUG_MODE
-
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        SELECT client_id, user_email, redirect_uri, scope, expires_at, used
-        FROM authorization_codes
-        WHERE code = ?
-        """,
-        (code,)
-    )
+    with get_reader() as conn:
+        cursor = conn.cursor()
 
-    result = cursor.fetchone()
+        cursor.execute(
+            """
+            SELECT client_id, user_email, redirect_uri, scope, expires_at, used
+            FROM authorization_codes
+            WHERE code = ?
+            """,
+            (code,)
+        )
 
-    if DEBUG_MODE:
-        print(f"DEBUG verify_authorization_code: code={code[:20]}...")
-        print(f"DEBUG verify_authorization_code: result from DB={result}")
+        result = cursor.fetchone()
 
-    conn.close()
+        if DEBUG_MODE:
+            print(f"DEBUG verify_authorization_code: code={code[:20]}...")
+            print(f"DEBUG verify_authorization_code: result from DB={result}")
 
     if not result:
         if DEBUG_MODE:
@@ -113,16 +107,13 @@ def verify_authorization_code(
 
 def mark_code_as_used(code: str) -> None:
     """Mark authorization code as used (one-time use only)."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "UPDATE authorization_codes SET used = TRUE WHERE code = ?",
-        (code,)
-    )
-    
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(
+            "UPDATE authorization_codes SET used = TRUE WHERE code = ?",
+            (code,)
+        )
 
 
 def create_access_token(
@@ -138,20 +129,17 @@ def create_access_token(
     token = secrets.token_urlsafe(32)
     expires_at = datetime.now() + timedelta(seconds=expires_in_seconds)
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        """
-        INSERT INTO access_tokens 
-        (token, client_id, user_email, scope, expires_at, revoked)
-        VALUES (?, ?, ?, ?, ?, FALSE)
-        """,
-        (token, client_id, user_email, scope, expires_at)
-    )
-    
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            INSERT INTO access_tokens 
+            (token, client_id, user_email, scope, expires_at, revoked)
+            VALUES (?, ?, ?, ?, ?, FALSE)
+            """,
+            (token, client_id, user_email, scope, expires_at)
+        )
     
     return token
 
@@ -166,8 +154,6 @@ def exchange_code_for_token(
     Exchange authorization code for access token.
     This is step 2 of OAuth 2.0 authorization code flow.
     """
-    from config import DEBUG_MODE
-
     # Verify client credentials
     app = get_app_by_client_id(client_id)
     if DEBUG_MODE:
@@ -213,20 +199,19 @@ def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
     Verify access token and return user info + scopes.
     Returns None if token is invalid, expired, or revoked.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        SELECT client_id, user_email, scope, expires_at, revoked
-        FROM access_tokens
-        WHERE token = ?
-        """,
-        (token,)
-    )
+    with get_reader() as conn:
+        cursor = conn.cursor()
 
-    result = cursor.fetchone()
-    conn.close()
+        cursor.execute(
+            """
+            SELECT client_id, user_email, scope, expires_at, revoked
+            FROM access_tokens
+            WHERE token = ?
+            """,
+            (token,)
+        )
+
+        result = cursor.fetchone()
 
     if not result:
         return None
@@ -250,51 +235,45 @@ def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
 
 def revoke_access_token(token: str) -> bool:
     """Revoke an access token."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_writer() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute(
-        "UPDATE access_tokens SET revoked = TRUE WHERE token = ?",
-        (token,)
-    )
+        cursor.execute(
+            "UPDATE access_tokens SET revoked = TRUE WHERE token = ?",
+            (token,)
+        )
 
-    rows_affected = cursor.rowcount
-    conn.commit()
-    conn.close()
+        rows_affected = cursor.rowcount
 
     return rows_affected > 0
 
 
 def cleanup_expired_codes() -> int:
     """Clean up expired authorization codes. Returns number of deleted codes."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_writer() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute(
-        "DELETE FROM authorization_codes WHERE expires_at < ?",
-        (datetime.now(),)
-    )
+        cursor.execute(
+            "DELETE FROM authorization_codes WHERE expires_at < ?",
+            (datetime.now(),)
+        )
 
-    deleted = cursor.rowcount
-    conn.commit()
-    conn.close()
+        deleted = cursor.rowcount
 
     return deleted
 
 
 def cleanup_expired_tokens() -> int:
     """Clean up expired access tokens. Returns number of deleted tokens."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_writer() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute(
-        "DELETE FROM access_tokens WHERE expires_at < ?",
-        (datetime.now(),)
-    )
+        cursor.execute(
+            "DELETE FROM access_tokens WHERE expires_at < ?",
+            (datetime.now(),)
+        )
 
-    deleted = cursor.rowcount
-    conn.commit()
-    conn.close()
+        deleted = cursor.rowcount
 
     return deleted
 
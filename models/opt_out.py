@@ -4,7 +4,7 @@ import secrets
 import sqlite3
 from datetime import datetime
 from typing import Optional, Dict, Any
-from utils.database import get_db_connection
+from utils.database import get_reader, get_writer
 
 
 def generate_opt_out_token() -> str:
@@ -17,27 +17,24 @@ def create_opt_out_token(user_email: str) -> str:
     Create a new opt-out token for a user.
     Returns the token string.
     """
-    conn = get_db_connection()
     token = generate_opt_out_token()
 
-    # Check if user already has an unused token
-    existing = conn.execute(
-        "SELECT token FROM opt_out_tokens WHERE user_email = ? AND is_used = FALSE",
-        (user_email,),
-    ).fetchone()
-
-    if existing:
-        # Return existing unused token
-        conn.close()
-        return existing["token"]
-
-    # Create new token
-    conn.execute(
-        "INSERT INTO opt_out_tokens (user_email, token) VALUES (?, ?)",
-        (user_email, token),
-    )
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        # Check if user already has an unused token
+        existing = conn.execute(
+            "SELECT token FROM opt_out_tokens WHERE user_email = ? AND is_used = FALSE",
+            (user_email,),
+        ).fetchone()
+
+        if existing:
+            # Return existing unused token
+            return existing["token"]
+
+        # Create new token
+        conn.execute(
+            "INSERT INTO opt_out_tokens (user_email, token) VALUES (?, ?)",
+            (user_email, token),
+        )
 
     return token
 
@@ -47,16 +44,15 @@ def get_opt_out_token_info(token: str) -> Optional[Dict[str, Any]]:
     Get information about an opt-out token.
     Returns None if token doesn't exist.
     """
-    conn = get_db_connection()
-    result = conn.execute(
-        """
-        SELECT user_email, created_at, used_at, is_used 
-        FROM opt_out_tokens 
-        WHERE token = ?
-        """,
-        (token,),
-    ).fetchone()
-    conn.close()
+    with get_reader() as conn:
+        result = conn.execute(
+            """
+            SELECT user_email, created_at, used_at, is_used
+            FROM opt_out_tokens
+            WHERE token = ?
+            """,
+            (token,),
+        ).fetchone()
 
     if result:
         return {
@@ -73,24 +69,20 @@ def mark_opt_out_token_used(token: str) -> bool:
     Mark an opt-out token as used.
     Returns True if successful, False if token doesn't exist or already used.
     """
-    conn = get_db_connection()
-
-    # Check if token exists and is not used
-    existing = conn.execute(
-        "SELECT is_used FROM opt_out_tokens WHERE token = ?", (token,)
-    ).fetchone()
+    with get_writer() as conn:
+        # Check if token exists and is not used
+        existing = conn.execute(
+            "SELECT is_used FROM opt_out_tokens WHERE token = ?", (token,)
+        ).fetchone()
 
-    if not existing or existing["is_used"]:
-        conn.close()
-        return False
+        if not existing or existing["is_used"]:
+            return False
 
-    # Mark as used
-    conn.execute(
-        "UPDATE opt_out_tokens SET used_at = CURRENT_TIMESTAMP, is_used = TRUE WHERE token = ?",
-        (token,),
-    )
-    conn.commit()
-    conn.close()
+        # Mark as used
+        conn.execute(
+            "UPDATE opt_out_tokens SET used_at = CURRENT_TIMESTAMP, is_used = TRUE WHERE token = ?",
+            (token,),
+        )
 
     return True
 
@@ -100,16 +92,15 @@ def get_all_users_for_opt_out() -> list:
     Get all users who can receive opt-out links.
     Returns list of dicts with email, legal_name, preferred_name.
     """
-    conn = get_db_connection()
-    results = conn.execute(
-        """
-        SELECT email, legal_name, preferred_name 
-        FROM users 
-        WHERE email IS NOT NULL 
-        ORDER BY email
-        """
-    ).fetchall()
-    conn.close()
+    with get_reader() as conn:
+        results = conn.execute(
+            """
+            SELECT email, legal_name, preferred_name
+            FROM users
+            WHERE email IS NOT NULL
+            ORDER BY email
+            """
+        ).fetchall()
 
     return [
         {
@@ -127,43 +118,35 @@ def cleanup_old_tokens(days_old: int = 365) -> int:
     Clean up old opt-out tokens (used or very old unused ones).
     Returns number of tokens deleted.
     """
-    conn = get_db_connection()
-
-    # Delete tokens that are either used or older than specified days
-    cursor = conn.execute(
-        """
-        DELETE FROM opt_out_tokens 
-        WHERE is_used = TRUE 
-        OR datetime(created_at) < datetime('now', '-{} days')
-        """.format(
-            days_old
+    with get_writer() as conn:
+        # Delete tokens that are either used or older than specified days
+        cursor = conn.execute(
+            """
+            DELETE FROM opt_out_tokens
+            WHERE is_used = TRUE
+            OR datetime(created_at) < datetime('now', '-{} days')
+            """.format(
+                days_old
+            )
         )
-    )
 
-    deleted_count = cursor.rowcount
-    conn.commit()
-    conn.close()
-
-    return deleted_count
+    return cursor.rowcount
 
 
 def get_opt_out_stats() -> Dict[str, int]:
     """Get statistics about opt-out tokens."""
-    conn = get_db_connection()
-
-    total = conn.execute("SELECT COUNT(*) as count FROM opt_out_tokens").fetchone()[
-        "count"
-    ]
-    used = conn.execute(
-        "SELECT COUNT(*) as count FROM opt_out_tokens WHERE is_used = TRUE"
-    ).fetchone()["count"]
-    unused = conn.execute(
-        "SELECT COUNT(*) as count FROM opt_out_tokens WHERE is_used = FALSE"
-    ).fetchone()["count"]
+    # One scan for all three counts
+    with get_reader() as conn:
+        row = conn.execute(
+            """
+            SELECT COUNT(*) AS total,
+                   COALESCE(SUM(is_used = TRUE), 0) AS used,
+                   COALESCE(SUM(is_used = FALSE), 0) AS unused
+            FROM opt_out_tokens
+            """
+        ).fetchone()
 
-    conn.close()
-
-    return {"total": total, "used": used, "unused": unused}
+    return {"total": row["total"], "used": row["used"], "unused": row["unused"]}
 
 
 def validate_opt_out_token(token: str) -> tuple[bool, Optional[str], Optional[str]]:
@@ -191,15 +174,12 @@ def get_user_opt_out_token(user_email: str) -> Optional[str]:
     """
     Get existing unused opt-out token for a user, or create a new one.
     """
-    conn = get_db_connection()
-
     # Check for existing unused token
-    existing = conn.execute(
-        "SELECT token FROM opt_out_tokens WHERE user_email = ? AND is_used = FALSE",
-        (user_email,),
-    ).fetchone()
-
-    conn.close()
+    with get_reader() as conn:
+        existing = conn.execute(
+            "SELECT token FROM opt_out_tokens WHERE user_email = ? AND is_used = FALSE",
+            (user_email,),
+        ).fetchone()
 
     if existing:
         return existing["token"]
@@ -213,19 +193,14 @@ def revoke_opt_out_token(user_email: str) -> bool:
     Revoke (mark as used) all unused opt-out tokens for a user.
     Useful if user changes their mind or for admin purposes.
     """
-    conn = get_db_connection()
-
-    cursor = conn.execute(
-        """
-        UPDATE opt_out_tokens 
-        SET used_at = CURRENT_TIMESTAMP, is_used = TRUE 
-        WHERE user_email = ? AND is_used = FALSE
-        """,
-        (user_email,),
-    )
-
-    revoked_count = cursor.rowcount
-    conn.commit()
-    conn.close()
+    with get_writer() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE opt_out_tokens
+            SET used_at = CURRENT_TIMESTAMP, is_used = TRUE
+            WHERE user_email = ? AND is_used = FALSE
+            """,
+            (user_email,),
+        )
 
-    return revoked_count > 0
+    return cursor.rowcount > 0
@@ -1,6 +1,8 @@
 """User models and database operations using Teable."""
 
 import json
+import msgspec
+from collections import Counter
 from typing import Optional, Dict, List, Any
 from utils.teable import (
     create_record,
@@ -10,6 +12,21 @@ from utils.teable import (
     find_record_by_field,
     count_records
 )
+from utils.cache import TTLCache
+
+# Short-lived cache for per-page user lookups (e.g. template context)
+_user_cache = TTLCache(maxsize=5000, ttl=30)
+
+# Fields update_user() may write
+UPDATABLE_USER_FIELDS = frozenset({
+    "email",
+    "legal_name",
+    "preferred_name",
+    "pronouns",
+    "dob",
+    "discord_id",
+    "events",
+})
 
 
 def create_user(
@@ -27,7 +44,7 @@ def create_user(
     if existing:
         return None
 
-    events_json = json.dumps(events or [])
+    events_json = _encode_events(events or [])
 
     record_data = {
         "email": email,
@@ -55,11 +72,29 @@ def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
             **record['fields']
         }
         # Parse events JSON
-        user_dict["events"] = json.loads(user_dict.get("events", "[]"))
+        user_dict["events"] = _decode_events(user_dict.get("events"))
         return user_dict
     return None
 
 
+def get_cached_user_by_email(email: str) -> Optional[Dict[str, Any]]:
+    """Get user by email, served from a short-lived in-process cache."""
+    user = _user_cache.get(email)
+    if user is None:
+        user = get_user_by_email(email)
+        if user:
+            _user_cache.set(email, user)
+    return user
+
+
+def invalidate_user_cache(user_id: Optional[str] = None):
+    """Drop cached lookups for a user record, or everything if no ID given."""
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.discard_where(lambda user: user.get("id") == user_id)
+
+
 def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
     """Get user by Teable record ID."""
     # Get all records and filter by ID (Teable doesn't have a get-by-ID endpoint)
@@ -72,7 +107,7 @@ def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
                 "id": record['id'],
                 **record['fields']
             }
-            user_dict["events"] = json.loads(user_dict.get("events", "[]"))
+            user_dict["events"] = _decode_events(user_dict.get("events"))
             return user_dict
     return None
 
@@ -86,68 +121,107 @@ def get_user_by_discord_id(discord_id: str) -> Optional[Dict[str, Any]]:
             "id": record['id'],
             **record['fields']
         }
-        user_dict["events"] = json.loads(user_dict.get("events", "[]"))
+        user_dict["events"] = _decode_events(user_dict.get("events"))
         return user_dict
     return None
 
 
 def update_user(user_id: str, **kwargs):
     """Update user with given fields."""
-    # Define allowed fields
-    allowed_fields = {
-        "email",
-        "legal_name",
-        "preferred_name",
-        "pronouns",
-        "dob",
-        "discord_id",
-        "events",
-    }
-
     # Build update data
     update_data = {}
     for field, value in kwargs.items():
-        if field not in allowed_fields:
+        if field not in UPDATABLE_USER_FIELDS:
             raise ValueError(f"Invalid field name: {field}")
 
         if field == "events" and isinstance(value, list):
-            value = json.dumps(value)
+            value = _encode_events(value)
 
         update_data[field] = value
 
     if update_data:
         update_record('users', user_id, update_data)
+        invalidate_user_cache(user_id)
 
 
 def delete_user(user_id: str):
     """Delete user by ID."""
     delete_record('users', user_id)
+    invalidate_user_cache(user_id)
 
 
 def get_all_users() -> List[Dict[str, Any]]:
     """Get all users from database."""
     records = get_records('users', limit=1000)
 
-    users_data = []
-    for record in records:
-        user_dict = {
+    users_data = [
+        {
             "id": record['id'],
             **record['fields']
         }
-        user_dict["events"] = json.loads(user_dict.get("events", "[]"))
-        users_data.append(user_dict)
+        for record in records
+    ]
+
+    for user_dict, events in zip(users_data, _decode_events_column(users_data)):
+        user_dict["events"] = events
 
     return users_data
 
 
+# msgspec (already a dependency) parses and encodes JSON several times faster
+# than the stdlib, which adds up when decoding every user's events column
+_json_decode = msgspec.json.decode
+_json_encode = msgspec.json.encode
+
+
+def _encode_events(events: List[str]) -> str:
+    """Encode an events list as compact JSON text for Teable."""
+    return _json_encode(events).decode()
+
+
+def _decode_events(raw: Any) -> List[str]:
+    """Decode one user's events JSON, skipping the parser for empty values."""
+    if not raw or raw == "[]":
+        return []
+    if isinstance(raw, list):
+        return raw
+    try:
+        return _json_decode(raw)
+    except msgspec.DecodeError as e:
+        raise json.JSONDecodeError(str(e), raw, 0) from None
+
+
+def _decode_events_column(users: List[Dict[str, Any]]) -> List[Any]:
+    """Decode every user's events JSON in a single parser pass."""
+    raw_events = [user.get("events") or "[]" for user in users]
+    try:
+        decoded = _json_decode("[" + ",".join(raw_events) + "]")
+    except msgspec.DecodeError:
+        decoded = None
+    # A malformed row either poisons the batch or (like '["a"],["b"]') splits
+    # into extra values that would shift later users' events, so re-parse per row
+    if decoded is None or len(decoded) != len(raw_events):
+        return [_decode_events(raw) for raw in raw_events]
+    return decoded
+
+
 def get_users_by_event(event_id: str) -> List[Dict[str, Any]]:
     """Get all users registered for a specific event."""
-    all_users = get_all_users()
+    records = get_records('users', limit=1000)
+    # The event ID as it appears inside the stored JSON text
+    needle = json.dumps(event_id)
 
     event_users = []
-    for user in all_users:
-        if event_id in user.get("events", []):
-            event_users.append(user)
+    for record in records:
+        raw_events = record['fields'].get("events")
+        # Most users aren't registered, so a substring check rules them out
+        # without running the JSON parser
+        if isinstance(raw_events, str) and needle not in raw_events:
+            continue
+
+        events = _decode_events(raw_events)
+        if event_id in events:
+            event_users.append({"id": record['id'], **record['fields'], "events": events})
 
     return event_users
 
@@ -180,17 +254,23 @@ def remove_user_from_event(user_id: str, event_id: str) -> bool:
     return True
 
 
+def count_users_by_event() -> Dict[str, int]:
+    """Count registered users per event from a single fetch of all users."""
+    # Only the events column is needed, so don't pull every user's full record
+    records = get_records('users', limit=1000, fields=['events'])
+    users = [record['fields'] for record in records]
+
+    event_counts = Counter()
+    for events in _decode_events_column(users):
+        event_counts.update(set(events))
+    return dict(event_counts)
+
+
 def get_users_stats() -> Dict[str, Any]:
     """Get user statistics."""
     total_users = count_records('users')
 
     # Count users by event
-    all_users = get_all_users()
-    event_counts = {}
-
-    for user in all_users:
-        events = user.get("events", [])
-        for event in events:
-            event_counts[event] = event_counts.get(event, 0) + 1
+    event_counts = count_users_by_event()
 
     return {"total_users": total_users, "event_counts": event_counts}
@@ -1,6 +1,7 @@
 """Admin routes for user and API key management."""
 
 import json
+from functools import wraps
 from flask import (
     Blueprint,
     render_template,
@@ -11,7 +12,12 @@ from flask import (
 )
 
 # CSRF exemption will be handled in app.py
-from models.user import get_all_users
+from models.user import (
+    get_all_users,
+    get_user_by_email,
+    update_user,
+    UPDATABLE_USER_FIELDS,
+)
 from models.api_key import (
     get_all_api_keys,
     create_api_key,
@@ -47,6 +53,7 @@ admin_bp = Blueprint("admin", __name__)
 def require_admin(f):
     """Decorator to require admin authentication."""
 
+    @wraps(f)
     def wrapper(*args, **kwargs):
         if "user_email" not in session:
             return jsonify({"success": False, "error": "Not authenticated"}), 401
@@ -56,7 +63,6 @@ def require_admin(f):
 
         return f(*args, **kwargs)
 
-    wrapper.__name__ = f.__name__
     return wrapper
 
 
@@ -81,6 +87,7 @@ def get_admin_page_permissions():
 def require_page_permission(page_name, access_level="read"):
     """Decorator to require specific page permission."""
     def decorator(f):
+        @wraps(f)
         def wrapper(*args, **kwargs):
             if "user_email" not in session:
                 return jsonify({"success": False, "error": "Not authenticated"}), 401
@@ -97,7 +104,6 @@ def require_page_permission(page_name, access_level="read"):
 
             return f(*args, **kwargs)
 
-        wrapper.__name__ = f.__name__
         return wrapper
     return decorator
 
@@ -172,19 +178,21 @@ def get_events_data():
     """Get events data for DataTables - requires events read permission."""
     try:
         from utils.events import get_all_events
-        from models.user import get_users_by_event
+        from models.user import count_users_by_event
 
         events = get_all_events()
         events_list = []
 
+        # One pass over all users instead of refetching them for every event
+        event_counts = count_users_by_event()
+
         for event_id, event_data in events.items():
             # Skip config
             if event_id.startswith('_'):
                 continue
 
             # Get user count for this event
-            users = get_users_by_event(event_id)
-            user_count = len(users)
+            user_count = event_counts.get(event_id, 0)
 
             events_list.append({
                 "id": event_id,
@@ -221,8 +229,6 @@ def admin_keys():
 def update_user_route():
     """Update user data - requires attendees write permission."""
     try:
-        from models.user import get_user_by_email, update_user
-
         data = request.get_json()
         email = data.get("email")
         field = data.get("field")
@@ -234,6 +240,9 @@ def update_user_route():
         if not field:
             return jsonify({"success": False, "error": "Field is required"})
 
+        if field not in UPDATABLE_USER_FIELDS:
+            return jsonify({"success": False, "error": f"Invalid field name: {field}"})
+
         # Get user by email to get the ID
         user = get_user_by_email(email)
         if not user:
@@ -248,6 +257,10 @@ def update_user_route():
             # Handle text fields (empty strings should remain as empty strings for Teable)
             update_value = value if value and value.strip() else ""
 
+        # Inline edits often resubmit the current value; skip the Teable write
+        if user.get(field, "") == update_value:
+            return jsonify({"success": True})
+
         # Execute update using model
         update_user(user['id'], **{field: update_value})
 
@@ -2,6 +2,7 @@
 
 import os
 import tempfile
+from functools import wraps
 from flask import (
     Blueprint,
     render_template,
@@ -24,6 +25,7 @@ admin_database_bp = Blueprint("admin_database", __name__)
 def require_admin(f):
     """Decorator to require admin authentication."""
 
+    @wraps(f)
     def wrapper(*args, **kwargs):
         if "user_email" not in session:
             return jsonify({"success": False, "error": "Not authenticated"}), 401
@@ -33,7 +35,6 @@ def require_admin(f):
 
         return f(*args, **kwargs)
 
-    wrapper.__name__ = f.__name__
     return wrapper
 
 
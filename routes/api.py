@@ -1,6 +1,7 @@
 """API routes for event registration and temporary info submission."""
 
-from flask import Blueprint, request, jsonify
+from functools import wraps
+from flask import Blueprint, Response, request, jsonify, g
 from services.event_service import (
     register_user_for_event,
     get_user_event_status,
@@ -9,18 +10,25 @@ from utils.events import get_current_event, get_event_info, get_all_events
 from utils.validation import validate_api_request
 from utils.error_handling import handle_api_error, handle_validation_error
 from utils.rate_limiter import rate_limit_api_key
-from models.api_key import get_key_permissions, log_api_key_usage
+from models.api_key import get_key_permissions, MIN_API_KEY_LENGTH
+from utils.usage_logger import enqueue_api_key_usage
 from models.oauth_token import verify_oauth_token
+from models.oauth import verify_access_token
 from models.user import (
     get_user_by_email,
     get_user_by_discord_id,
     update_user,
     get_all_users,
 )
-from models.auth import save_verification_token, get_verification_token, mark_token_used
+from models.auth import (
+    save_verification_token,
+    get_verification_token,
+    consume_verification_token,
+)
 from models.admin import is_admin
 from config import DEBUG_MODE
 import json
+import time
 from datetime import datetime
 
 api_bp = Blueprint("api", __name__)
@@ -29,44 +37,60 @@ api_bp = Blueprint("api", __name__)
 def require_api_key(required_permissions=None):
     """Decorator to require API key authentication with specific permissions."""
 
+    # Normalize once at decoration time rather than on every request
+    if isinstance(required_permissions, str):
+        required_perms = frozenset([required_permissions])
+    elif required_permissions is not None:
+        required_perms = frozenset(required_permissions)
+    else:
+        required_perms = None
+
     def decorator(f):
+        @wraps(f)
         def wrapper(*args, **kwargs):
-            auth_header = request.headers.get("Authorization")
-            if not auth_header or not auth_header.startswith("Bearer "):
+            # Raw WSGI environ lookup skips the case-insensitive header mapping
+            auth_header = request.environ.get("HTTP_AUTHORIZATION", "")
+            if not auth_header.startswith("Bearer "):
                 return (
                     jsonify({"error": "Missing or invalid Authorization header"}),
                     401,
                 )
 
             api_key = auth_header[7:]  # Remove "Bearer " prefix
-            permissions = get_key_permissions(api_key)
+            if len(api_key) < MIN_API_KEY_LENGTH:
+                return jsonify({"error": "Invalid API key"}), 403
+
+            # Stacked require_api_key checks reuse the first lookup of the request
+            cached = getattr(g, "api_key_auth", None)
+            first_check = cached is None or cached[0] != api_key
+            if first_check:
+                permissions = get_key_permissions(api_key)
+                g.api_key_auth = (api_key, permissions)
+            else:
+                permissions = cached[1]
 
             if not permissions:  # Key doesn't exist or has no permissions
                 return jsonify({"error": "Invalid API key"}), 403
 
-            # Check required permissions
-            if required_permissions is not None:
-                required_perms = required_permissions
-                if isinstance(required_perms, str):
-                    required_perms = [required_perms]
-
-                if not any(perm in permissions for perm in required_perms):
-                    return jsonify({"error": "Insufficient permissions"}), 403
+            # Check required permissions (any one of them is sufficient)
+            if required_perms is not None and permissions.isdisjoint(required_perms):
+                return jsonify({"error": "Insufficient permissions"}), 403
 
-            # Log the API usage
-            log_api_key_usage(
-                api_key,
-                f.__name__,
-                {
-                    "endpoint": request.endpoint,
-                    "method": request.method,
-                    "ip": request.remote_addr,
-                },
-            )
+            # Log the API usage once per request (written in the background)
+            if first_check:
+                environ = request.environ
+                enqueue_api_key_usage(
+                    api_key,
+                    f.__name__,
+                    {
+                        "endpoint": request.endpoint,
+                        "method": environ.get("REQUEST_METHOD"),
+                        "ip": environ.get("REMOTE_ADDR"),
+                    },
+                )
 
             return f(*args, **kwargs)
 
-        wrapper.__name__ = f.__name__
         return wrapper
 
     return decorator
@@ -233,7 +257,6 @@ def oauth2_user_info():
         token = auth_header[7:]  # Remove "Bearer " prefix
 
         # Verify access token
-        from models.oauth import verify_access_token
         token_data = verify_access_token(token)
 
         if not token_data:
@@ -326,19 +349,20 @@ def oauth_user_info_legacy():
         return jsonify({"success": False, "error": "Internal server error"}), 500
 
 
+# The /api/test body is constant apart from the timestamp, so it is
+# serialized once (same bytes jsonify would produce) and spliced per request
+_API_TEST_PREFIX = b'{"message":"API key authentication successful!","success":true,"timestamp":"'
+_API_TEST_SUFFIX = b'"}\n'
+
+
 # Test endpoint (requires API key)
 @api_bp.route("/api/test", methods=["GET"])
 @require_api_key(["users.read"])
 def api_test():
     """Test endpoint that requires API key with users.read permission."""
-    from datetime import datetime
-
-    return jsonify(
-        {
-            "success": True,
-            "message": "API key authentication successful!",
-            "timestamp": datetime.now().isoformat(),
-        }
+    timestamp = datetime.now().isoformat().encode("ascii")
+    return Response(
+        _API_TEST_PREFIX + timestamp + _API_TEST_SUFFIX, mimetype="application/json"
     )
 
 
@@ -440,7 +464,9 @@ def api_get_verification_token(token):
                         "discord_id": token_data["discord_id"],
                         "discord_username": token_data["discord_username"],
                         "message_id": token_data["message_id"],
-                        "expires_at": token_data["expires_at"],
+                        "expires_at": time.strftime(
+                            "%Y-%m-%d %H:%M:%S", time.gmtime(token_data["expires_at"])
+                        ),
                         "used": bool(token_data["used"]),
                     },
                 }
@@ -458,17 +484,14 @@ def api_get_verification_token(token):
 def api_mark_token_used(token):
     """Mark verification token as used."""
     try:
-        # Check if token exists first
-        token_data = get_verification_token(token)
+        # Check and mark as used in one statement
+        token_data = consume_verification_token(token)
         if not token_data:
             return (
                 jsonify({"success": False, "error": "Token not found or expired"}),
                 404,
             )
 
-        # Mark as used
-        mark_token_used(token)
-
         return jsonify({"success": True, "message": "Token marked as used"}), 200
 
     except Exception as e:
@@ -31,12 +31,18 @@ from models.oauth import (
 )
 from models.admin import is_admin
 from config import DEBUG_MODE
+from utils.cache import TTLCache
 from urllib.parse import unquote
+from datetime import datetime
 import json
 
 auth_bp = Blueprint("auth", __name__)
 oauth_bp = Blueprint("oauth", __name__)  # Separate blueprint for OAuth 2.0 endpoints (CSRF exempt)
 
+# One magic link per address per minute; repeats skip WorkOS and SMTP entirely
+EMAIL_RESEND_COOLDOWN = 60  # seconds
+_recent_email_sends = TTLCache(maxsize=10_000, ttl=EMAIL_RESEND_COOLDOWN)
+
 
 @auth_bp.route("/")
 def index():
@@ -62,13 +68,8 @@ def index():
 @auth_bp.route("/auth/google")
 def auth_google():
     """Redirect to Google OAuth."""
-    if DEBUG_MODE:
-        print(f"DEBUG: Redirecting to Google OAuth")
-
-    google_auth_url = get_google_auth_url()
-    if DEBUG_MODE:
-        print(f"DEBUG: Auth URL = {google_auth_url}")
-    return redirect(google_auth_url)
+    # get_google_auth_url logs the URL in debug mode
+    return redirect(get_google_auth_url())
 
 
 @auth_bp.route("/auth/google/callback")
@@ -558,7 +559,19 @@ def send_code():
                 "auth.html", state="email_login", error="Email is required"
             )
 
+    email_key = email.strip().lower()
+    if _recent_email_sends.get(email_key):
+        error_msg = "Please wait a minute before requesting another link"
+        if request.is_json:
+            return jsonify({"success": False, "error": error_msg}), 429
+        else:
+            return render_template("auth.html", state="email_login", error=error_msg)
+    _recent_email_sends.set(email_key, True)
+
     success = send_email_verification(email)
+    if not success:
+        # Let the user retry straight away if nothing was actually sent
+        _recent_email_sends.pop(email_key)
 
     if success:
         if request.is_json:
@@ -697,19 +710,15 @@ def verify_discord():
             "auth.html", state="error", error="Invalid or expired verification link."
         )
 
-    # Store token in session for later use
+    # Only the token is kept in the session cookie; /verify/complete consumes it
+    # and gets the Discord details back from that same statement
     session.permanent = True
     session["verification_token"] = token
-    session["discord_id"] = token_info["discord_id"]
-    session["discord_username"] = token_info["discord_username"]
 
     # If user is already logged in, complete verification
     if "user_email" in session:
         return redirect(url_for("auth.verify_complete"))
 
-    # Store verification token in session for after login/registration
-    session["verification_token"] = token
-
     # Show login options (like OAuth flow) instead of immediately redirecting to Google
     return render_template("auth.html", state="email_login", verification_flow=True)
 
@@ -735,13 +744,11 @@ def verify_complete():
     )
 
     if result["success"]:
-        # Get full user data for the success page
-        user = get_user_by_email(session["user_email"])
+        # The user record looked up during verification feeds the success page
+        user = result["user"]
 
         # Clear verification session data
         session.pop("verification_token", None)
-        session.pop("discord_id", None)
-        session.pop("discord_username", None)
 
         return render_template(
             "verify_success.html",
@@ -797,8 +804,6 @@ def register():
     # Validate and convert date format from YYYY-MM-DD to MM/DD/YYYY
     if dob:
         try:
-            from datetime import datetime
-
             # Parse the HTML date input format (YYYY-MM-DD)
             date_obj = datetime.strptime(dob, "%Y-%m-%d")
             # Convert to MM/DD/YYYY format for storage
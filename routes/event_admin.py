@@ -1,5 +1,6 @@
 """Event-specific admin routes for viewing registrations and managing temporary data."""
 
+from functools import wraps
 from flask import (
 	Blueprint,
 	render_template,
@@ -8,6 +9,7 @@ from flask import (
 	jsonify,
 )
 from models.admin import is_admin, has_event_permission
+from models.user import count_users_by_event
 from services.event_service import get_event_registrations, get_event_registration_stats
 from utils.events import get_all_events, get_event_info, is_valid_event
 from config import DEBUG_MODE
@@ -18,12 +20,12 @@ event_admin_bp = Blueprint("event_admin", __name__)
 def require_admin(f):
     """Decorator to require admin authentication."""
 
+    @wraps(f)
     def wrapper(*args, **kwargs):
         if "user_email" not in session or not is_admin(session["user_email"]):
             return jsonify({"success": False, "error": "Unauthorized"}), 403
         return f(*args, **kwargs)
 
-    wrapper.__name__ = f.__name__
     return wrapper
 
 
@@ -52,10 +54,11 @@ def admin_events_list():
     # Get all events
     events = get_all_events()
 
-    # Get registration stats for each event
+    # Get registration stats for each event from one pass over all users
+    event_counts = count_users_by_event()
     events_with_stats = []
     for event_id, event_data in events.items():
-        stats = get_event_registration_stats(event_id)
+        stats = get_event_registration_stats(event_id, event_counts)
         events_with_stats.append(
             {
                 "id": event_id,
@@ -104,8 +107,8 @@ def admin_event_detail(event_id):
     event_info = result["event_info"]
     registrations = result["registrations"]
 
-    # Get registration stats
-    stats = get_event_registration_stats(event_id)
+    # Registrations were just fetched, so count them rather than refetching
+    stats = get_event_registration_stats(event_id, {event_id: len(registrations)})
 
     return render_template(
         "admin/event_detail.html",
@@ -124,9 +127,10 @@ def admin_purge_data_page():
     # Get all events with temporary data
     events = get_all_events()
     events_with_data = []
+    event_counts = count_users_by_event()
 
     for event_id, event_data in events.items():
-        stats = get_event_registration_stats(event_id)
+        stats = get_event_registration_stats(event_id, event_counts)
         if stats["temp_info_submitted"] > 0:
             events_with_data.append(
                 {
@@ -6,7 +6,8 @@ from workos import WorkOSClient
 from models.auth import (
     save_verification_token,
     get_verification_token,
-    mark_token_used,
+    consume_verification_token,
+    release_verification_token,
 )
 from models.user import (
     get_user_by_email,
@@ -14,9 +15,9 @@ from models.user import (
     update_user,
     get_user_by_discord_id,
 )
-from utils.discord import assign_discord_role, remove_all_event_roles
+from utils.discord import assign_discord_role, remove_all_event_roles, map_role_calls
 from utils.events import get_event_discord_role_id, get_hacker_role_id, is_legacy_event
-from utils.email import send_magic_link_email
+from utils.email import send_magic_link_email_async
 from config import (
     WORKOS_API_KEY,
     WORKOS_CLIENT_ID,
@@ -31,6 +32,13 @@ workos_client = WorkOSClient(
     client_id=WORKOS_CLIENT_ID,
 )
 
+# Everything in the Google sign-in URL except the per-login state is fixed per
+# deployment, so build it once (the SDK makes no HTTP calls for this)
+_GOOGLE_AUTH_URL_BASE = workos_client.sso.get_authorization_url(
+    redirect_uri=GOOGLE_REDIRECT_URI,
+    provider="GoogleOAuth",
+)
+
 
 def send_email_verification(email):
     """Send email verification (magic link) via WorkOS Passwordless."""
@@ -45,19 +53,19 @@ def send_email_verification(email):
         # Get the magic link from WorkOS
         magic_link = passwordless_session.link
 
-        # Manually send the email with the magic link
-        email_sent = send_magic_link_email(email, magic_link)
+        # Send the email with the magic link in the background
+        email_queued = send_magic_link_email_async(email, magic_link)
 
         if DEBUG_MODE:
             print(f"\n==== DEBUG: WorkOS Magic Link Created ====")
             print(f"To: {email}")
             print(f"Magic Link: {magic_link}")
             print(f"Session ID: {passwordless_session.id}")
-            print(f"Email sent: {email_sent}")
+            print(f"Email queued: {email_queued}")
             print(f"This link will expire in 10 minutes.")
             print(f"==========================================\n")
 
-        return email_sent
+        return email_queued
 
     except Exception as e:
         if DEBUG_MODE:
@@ -87,10 +95,6 @@ def verify_email_code(code):
 def handle_google_oauth_callback(auth_code):
     """Handle Google OAuth callback via WorkOS SSO and return user info."""
     try:
-        if DEBUG_MODE:
-            print(f"DEBUG: Received code: {auth_code[:20]}...")
-            print(f"DEBUG: Using WorkOS SSO for Google OAuth")
-
         # Exchange code for user profile via WorkOS
         profile_and_token = workos_client.sso.get_profile_and_token(auth_code)
         profile = profile_and_token.profile
@@ -124,44 +128,38 @@ def verify_discord_token(token):
 
 def complete_discord_verification(token, user_email):
     """Complete Discord verification by linking user account."""
-    token_info = get_verification_token(token)
-    if not token_info:
-        return {"success": False, "error": "Invalid or expired token"}
-
     # Get user by email
     user = get_user_by_email(user_email)
     if not user:
         return {"success": False, "error": "User not found"}
 
+    # Check and mark the token used in one statement so it can't be replayed
+    token_info = consume_verification_token(token)
+    if not token_info:
+        return {"success": False, "error": "Invalid or expired token"}
+
     # Update user with Discord ID
     try:
         update_user(user["id"], discord_id=token_info["discord_id"])
     except ValueError as e:
         return {"success": False, "error": str(e)}
-
-    # Mark token as used
-    mark_token_used(token)
+    except Exception as e:
+        # Teable is unreachable or erroring; don't burn the one-time link
+        print(f"Error linking Discord account: {e}")
+        release_verification_token(token)
+        return {
+            "success": False,
+            "error": "Could not link your Discord account. Please try again.",
+        }
 
     # Automatically assign Discord roles
-    roles_assigned = []
-    roles_failed = []
+    discord_id = token_info["discord_id"]
+    roles = []
 
     # Always assign Hacker role to all verified users for basic chat access
     hacker_role_id = get_hacker_role_id()
     if hacker_role_id:
-        success = assign_discord_role(token_info["discord_id"], hacker_role_id)
-        if success:
-            roles_assigned.append({"event_id": "_hacker", "role_id": hacker_role_id})
-            if DEBUG_MODE:
-                print(
-                    f"Successfully assigned Hacker role {hacker_role_id} to Discord user {token_info['discord_id']}"
-                )
-        else:
-            roles_failed.append({"event_id": "_hacker", "role_id": hacker_role_id})
-            if DEBUG_MODE:
-                print(
-                    f"Failed to assign Hacker role {hacker_role_id} to Discord user {token_info['discord_id']}"
-                )
+        roles.append({"event_id": "_hacker", "role_id": hacker_role_id})
 
     # Assign event-specific roles only for legacy events
     if user.get("events"):
@@ -170,31 +168,32 @@ def complete_discord_verification(token, user_email):
             if is_legacy_event(event_id):
                 role_id = get_event_discord_role_id(event_id)
                 if role_id:
-                    success = assign_discord_role(token_info["discord_id"], role_id)
-                    if success:
-                        roles_assigned.append(
-                            {"event_id": event_id, "role_id": role_id}
-                        )
-                        if DEBUG_MODE:
-                            print(
-                                f"Successfully assigned legacy event role {role_id} for event {event_id} to Discord user {token_info['discord_id']}"
-                            )
-                    else:
-                        roles_failed.append({"event_id": event_id, "role_id": role_id})
-                        if DEBUG_MODE:
-                            print(
-                                f"Failed to assign legacy event role {role_id} for event {event_id} to Discord user {token_info['discord_id']}"
-                            )
+                    roles.append({"event_id": event_id, "role_id": role_id})
             else:
                 if DEBUG_MODE:
                     print(
                         f"Skipping non-legacy event {event_id} - user will only get Hacker role for basic chat access"
                     )
 
+    # The Discord calls are independent, so they go out concurrently
+    results = map_role_calls(
+        assign_discord_role, discord_id, [role["role_id"] for role in roles]
+    )
+    roles_assigned = [role for role, ok in zip(roles, results) if ok]
+    roles_failed = [role for role, ok in zip(roles, results) if not ok]
+
+    if DEBUG_MODE:
+        for role, ok in zip(roles, results):
+            outcome = "Successfully assigned" if ok else "Failed to assign"
+            print(
+                f"{outcome} role {role['role_id']} ({role['event_id']}) to Discord user {discord_id}"
+            )
+
     return {
         "success": True,
         "discord_id": token_info["discord_id"],
         "discord_username": token_info["discord_username"],
+        "user": user,
         "roles_assigned": roles_assigned,
         "roles_failed": roles_failed,
         "total_roles_assigned": len(roles_assigned),
@@ -240,12 +239,8 @@ def get_google_auth_url():
     state = secrets.token_urlsafe()
     session["oauth_state"] = state
 
-    # Use WorkOS SSO with Google OAuth provider
-    authorization_url = workos_client.sso.get_authorization_url(
-        redirect_uri=GOOGLE_REDIRECT_URI,
-        provider="GoogleOAuth",
-        state=state,
-    )
+    # token_urlsafe output needs no escaping in a query string
+    authorization_url = f"{_GOOGLE_AUTH_URL_BASE}&state={state}"
 
     if DEBUG_MODE:
         print(f"DEBUG: WorkOS Google OAuth URL: {authorization_url}")
@@ -1,6 +1,5 @@
 """Dashboard service for user profile and event information."""
 
-import json
 from typing import Dict, List, Any, Optional
 from models.user import get_user_by_email
 from utils.events import get_all_events, get_current_event
@@ -49,15 +48,8 @@ def get_user_dashboard_data(user_email: str) -> Dict[str, Any]:
 
     # Get enrolled events
     events_data = get_all_events()
-    events_field = user.get("events", "[]")
-
-    # Handle both string and list formats
-    if isinstance(events_field, str):
-        user_events = json.loads(events_field)
-    elif isinstance(events_field, list):
-        user_events = events_field
-    else:
-        user_events = []
+    # get_user_by_email has already decoded the events JSON into a list
+    user_events = user.get("events") or []
 
     for event_id in user_events:
         if event_id in events_data:
@@ -168,13 +160,8 @@ def get_event_participation_summary(user_email: str) -> Dict[str, Any]:
     if not user:
         return {"total_events": 0, "registered_events": 0, "completed_events": 0}
 
-    events_field = user.get("events", "[]")
-    if isinstance(events_field, str):
-        user_events = json.loads(events_field)
-    elif isinstance(events_field, list):
-        user_events = events_field
-    else:
-        user_events = []
+    # get_user_by_email has already decoded the events JSON into a list
+    user_events = user.get("events") or []
 
     return {
         "total_events": len(user_events),
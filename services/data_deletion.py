@@ -2,7 +2,7 @@
 
 import logging
 from typing import Dict, List, Any, Optional
-from utils.database import get_db_connection
+from utils.database import get_reader, get_writer
 from models.user import get_user_by_email
 from config import DEBUG_MODE
 from services.listmonk_service import delete_subscriber_by_email
@@ -16,8 +16,6 @@ def get_user_data_summary(user_email: str) -> Dict[str, Any]:
     Get a summary of all data associated with a user.
     Used to show users what will be deleted.
     """
-    conn = get_db_connection()
-
     summary = {
         "user_found": False,
         "tables_with_data": [],
@@ -30,7 +28,6 @@ def get_user_data_summary(user_email: str) -> Dict[str, Any]:
     # Check if user exists
     user = get_user_by_email(user_email)
     if not user:
-        conn.close()
         return summary
 
     summary["user_found"] = True
@@ -43,15 +40,15 @@ def get_user_data_summary(user_email: str) -> Dict[str, Any]:
     # Skip API key logs for now (no direct user_email field)
 
     # Check opt-out tokens
-    opt_tokens = conn.execute(
-        "SELECT COUNT(*) as count FROM opt_out_tokens WHERE user_email = ?",
-        (user_email,),
-    ).fetchone()
+    with get_reader() as conn:
+        opt_tokens = conn.execute(
+            "SELECT COUNT(*) as count FROM opt_out_tokens WHERE user_email = ?",
+            (user_email,),
+        ).fetchone()
     if opt_tokens and opt_tokens["count"] > 0:
         summary["opt_out_tokens"] = opt_tokens["count"]
         summary["tables_with_data"].append("opt_out_tokens")
 
-    conn.close()
     return summary
 
 
@@ -166,39 +163,36 @@ def delete_user_data(user_email: str, include_discord: bool = True, include_list
                 logger.info(f"Successfully deleted {user_email} from Listmonk mailing list")
 
         # Delete from SQLite (ephemeral data only)
-        conn = get_db_connection()
         total_deleted = 0
 
-        # Delete from ephemeral tables in SQLite
-        ephemeral_tables = [
-            ("opt_out_tokens", "user_email", user_email),
-        ]
-
-        for table_name, column_name, value in ephemeral_tables:
-            try:
-                cursor = conn.execute(
-                    f"DELETE FROM {table_name} WHERE {column_name} = ?", (value,)
-                )
-                deleted_count = cursor.rowcount
+        with get_writer() as conn:
+            # Delete from ephemeral tables in SQLite
+            ephemeral_tables = [
+                ("opt_out_tokens", "user_email", user_email),
+            ]
 
-                if deleted_count > 0:
-                    result["deleted_from_tables"].append(table_name)
-                    result["deletion_counts"][table_name] = deleted_count
-                    total_deleted += deleted_count
-
-                    logger.info(
-                        f"Deleted {deleted_count} records from {table_name} for {user_email}"
+            for table_name, column_name, value in ephemeral_tables:
+                try:
+                    cursor = conn.execute(
+                        f"DELETE FROM {table_name} WHERE {column_name} = ?", (value,)
+                    )
+                    deleted_count = cursor.rowcount
+
+                    if deleted_count > 0:
+                        result["deleted_from_tables"].append(table_name)
+                        result["deletion_counts"][table_name] = deleted_count
+                        total_deleted += deleted_count
+
+                        logger.info(
+                            f"Deleted {deleted_count} records from {table_name} for {user_email}"
+                        )
+
+                except Exception as e:
+                    error_msg = f"Error deleting from {table_name}: {str(e)}"
+                    result["errors"].append(error_msg)
+                    logger.error(
+                        f"Data deletion error for {user_email} in {table_name}: {e}"
                     )
-
-            except Exception as e:
-                error_msg = f"Error deleting from {table_name}: {str(e)}"
-                result["errors"].append(error_msg)
-                logger.error(
-                    f"Data deletion error for {user_email} in {table_name}: {e}"
-                )
-
-        conn.commit()
-        conn.close()
 
         # Delete from Teable (persistent data)
         try:
@@ -248,29 +242,26 @@ def verify_user_deletion(user_email: str) -> Dict[str, Any]:
     }
 
     # Check SQLite (ephemeral data)
-    conn = get_db_connection()
-
-    sqlite_tables = [
-        ("opt_out_tokens", "user_email"),
-    ]
-
-    for table_name, column_name in sqlite_tables:
-        try:
-            count = conn.execute(
-                f"SELECT COUNT(*) as count FROM {table_name} WHERE {column_name} = ?",
-                (user_email,),
-            ).fetchone()["count"]
+    with get_reader() as conn:
+        sqlite_tables = [
+            ("opt_out_tokens", "user_email"),
+        ]
 
-            verification["tables_checked"].append(table_name)
+        for table_name, column_name in sqlite_tables:
+            try:
+                count = conn.execute(
+                    f"SELECT COUNT(*) as count FROM {table_name} WHERE {column_name} = ?",
+                    (user_email,),
+                ).fetchone()["count"]
 
-            if count > 0:
-                verification["completely_deleted"] = False
-                verification["remaining_data"][table_name] = count
+                verification["tables_checked"].append(table_name)
 
-        except Exception as e:
-            logger.error(f"Error checking {table_name} during verification: {e}")
+                if count > 0:
+                    verification["completely_deleted"] = False
+                    verification["remaining_data"][table_name] = count
 
-    conn.close()
+            except Exception as e:
+                logger.error(f"Error checking {table_name} during verification: {e}")
 
     # Check Teable (persistent data)
     try:
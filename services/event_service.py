@@ -171,22 +171,26 @@ def get_user_event_status(user_email, event_id=None):
         return {"success": False, "error": "Failed to get event status"}
 
 
-def get_event_registration_stats(event_id):
+def get_event_registration_stats(event_id, event_counts=None):
     """
     Get registration statistics for an event.
 
     Note: Since temporary_info table was removed, this only returns
     registered user count. No temp_info_submitted data.
+
+    Pass event_counts (from count_users_by_event) when building stats for
+    several events so users are only fetched once.
     """
     try:
-        from models.user import get_users_by_event
+        from models.user import count_users_by_event
 
-        # Count users registered for event
-        registered_users = get_users_by_event(event_id)
+        if event_counts is None:
+            event_counts = count_users_by_event()
 
         return {
-            "registered_users": len(registered_users),
+            "registered_users": event_counts.get(event_id, 0),
             "temp_info_submitted": 0,  # Obsolete - temporary_info table removed
+            "completion_rate": 0.0,  # Obsolete - temporary_info table removed
         }
 
     except Exception as e:
@@ -195,5 +199,6 @@ def get_event_registration_stats(event_id):
         return {
             "registered_users": 0,
             "temp_info_submitted": 0,
+            "completion_rate": 0.0,
         }
 
@@ -4,11 +4,15 @@ import logging
 import requests
 from requests.auth import HTTPBasicAuth
 from typing import Dict, Any, Optional
+from utils.http import make_session
 from config import LISTMONK_URL, LISTMONK_API_KEY, LISTMONK_ENABLED
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Shared session so a lookup followed by a delete reuses one connection
+_session = make_session(pool_connections=1, pool_maxsize=8, schemes=("http://", "https://"))
+
 
 def get_subscriber_by_email(email: str) -> Optional[Dict[str, Any]]:
     """
@@ -36,7 +40,7 @@ def get_subscriber_by_email(email: str) -> Optional[Dict[str, Any]]:
             "page": "1"
         }
         
-        response = requests.get(
+        response = _session.get(
             url, 
             auth=HTTPBasicAuth("admin", LISTMONK_API_KEY), 
             params=params,
@@ -107,7 +111,7 @@ def delete_subscriber_by_email(email: str) -> Dict[str, Any]:
         
         # Delete the subscriber
         url = f"{LISTMONK_URL}/api/subscribers/{subscriber_id}"
-        response = requests.delete(
+        response = _session.delete(
             url, 
             auth=HTTPBasicAuth("admin", LISTMONK_API_KEY),
             timeout=10
@@ -172,7 +176,7 @@ def add_subscriber(email: str, name: str = "", lists: list = None) -> Dict[str,
             "preconfirm_subscriptions": True
         }
         
-        response = requests.post(
+        response = _session.post(
             url,
             auth=HTTPBasicAuth("admin", LISTMONK_API_KEY),
             json=data,
@@ -0,0 +1,22 @@
+import os
+
+# config reads these at import, so they must be set before any app module loads
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("WORKOS_API_KEY", "test-workos-key")
+os.environ.setdefault("WORKOS_CLIENT_ID", "test-workos-client")
+
+import pytest
+
+import models.auth
+import utils.database
+import utils.db_init
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test.db")
+    monkeypatch.setattr(utils.database, "DATABASE", db_path)
+    monkeypatch.setattr(utils.db_init, "DATABASE", db_path)
+    utils.db_init.init_db()
+    models.auth._verification_token_cache.clear()
+    return db_path
@@ -0,0 +1,62 @@
+import models.api_key as api_key_model
+
+
+def _fake_lookup(calls):
+    def lookup(api_key):
+        calls.append(api_key)
+        if api_key != "hack.sv.valid":
+            return None
+        return {"id": "rec1", "permissions": ["users.read"], "rate_limit_rpm": 30}
+
+    return lookup
+
+
+def test_key_permissions_are_cached(monkeypatch):
+    calls = []
+    monkeypatch.setattr(api_key_model, "get_api_key_by_key", _fake_lookup(calls))
+    api_key_model.invalidate_api_key_cache()
+
+    assert api_key_model.get_key_permissions("hack.sv.valid") == frozenset({"users.read"})
+    assert api_key_model.get_key_rate_limit("hack.sv.valid") == 30
+    assert calls == ["hack.sv.valid"]
+
+
+def test_invalid_keys_are_not_cached(monkeypatch):
+    calls = []
+    monkeypatch.setattr(api_key_model, "get_api_key_by_key", _fake_lookup(calls))
+    api_key_model.invalidate_api_key_cache()
+
+    assert api_key_model.get_key_permissions("hack.sv.bogus") == frozenset()
+    assert api_key_model.get_key_permissions("hack.sv.bogus") == frozenset()
+    assert len(calls) == 2
+
+
+def test_invalidate_by_key_id(monkeypatch):
+    calls = []
+    monkeypatch.setattr(api_key_model, "get_api_key_by_key", _fake_lookup(calls))
+    api_key_model.invalidate_api_key_cache()
+
+    api_key_model.get_key_permissions("hack.sv.valid")
+    api_key_model.invalidate_api_key_cache("rec1")
+    api_key_model.get_key_permissions("hack.sv.valid")
+    assert len(calls) == 2
+
+
+def test_last_used_at_writes_are_throttled(monkeypatch, temp_db):
+    monkeypatch.setattr(api_key_model, "get_api_key_by_key", _fake_lookup([]))
+    updates = []
+    monkeypatch.setattr(
+        api_key_model, "update_records_batch", lambda table, records: updates.append(records)
+    )
+    api_key_model.invalidate_api_key_cache()
+    api_key_model._last_used_written.clear()
+
+    api_key_model.log_api_key_usage_batch([("hack.sv.valid", "a", None)])
+    api_key_model.log_api_key_usage_batch([("hack.sv.valid", "b", {"method": "GET"})])
+
+    assert len(updates) == 1
+    assert len(api_key_model.get_api_key_logs("rec1")) == 2
+    assert len(api_key_model.get_api_key_logs("rec1", limit=1)) == 1
+    assert len(api_key_model.get_api_key_logs("rec1", limit=None)) == 2
+    metadata = [log["metadata"] for log in api_key_model.get_api_key_logs("rec1")]
+    assert {"method": "GET"} in metadata and {} in metadata
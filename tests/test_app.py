@@ -0,0 +1,21 @@
+from app import create_app
+
+
+def test_missing_csrf_token_is_rejected_with_400():
+    client = create_app().test_client()
+
+    response = client.post("/send-code")
+
+    assert response.status_code == 400
+    assert b"The CSRF token is missing" in response.data
+    assert "nonce-" in response.headers["Content-Security-Policy"]
+
+
+def test_static_responses_keep_the_full_security_headers():
+    client = create_app().test_client()
+
+    response = client.get("/static/css/auth.css")
+
+    assert response.status_code == 200
+    assert "Content-Security-Policy" in response.headers
+    assert response.headers["X-XSS-Protection"] == "1; mode=block"
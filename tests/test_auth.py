@@ -1,9 +1,18 @@
-import os
 import string
 
-os.environ.setdefault("SECRET_KEY", "test-secret")
-
-from models.auth import generate_verification_code, generate_verification_token
+import models.auth
+import services.auth_service as auth_service
+import utils.database
+from models.auth import (
+    generate_verification_code,
+    generate_verification_token,
+    save_verification_code,
+    save_verification_token,
+    get_verification_token,
+    consume_verification_token,
+    verify_code,
+    cleanup_expired_email_codes,
+)
 
 
 def test_generate_verification_code_length_and_digits():
@@ -12,8 +21,76 @@ def test_generate_verification_code_length_and_digits():
     assert all(c in string.digits for c in code)
 
 
+def test_generate_verification_code_is_zero_padded(monkeypatch):
+    monkeypatch.setattr(models.auth.secrets, "randbelow", lambda n: 42)
+    assert generate_verification_code() == "000042"
+
+
 def test_generate_verification_token_length_and_alphabet():
     token = generate_verification_token()
     assert len(token) == 32
-    alphabet = string.ascii_letters + string.digits
+    alphabet = string.ascii_letters + string.digits + "-_"
     assert all(c in alphabet for c in token)
+    assert [len(generate_verification_token(n)) for n in range(1, 10)] == list(range(1, 10))
+
+
+def test_verify_code_consumes_code_once(temp_db):
+    save_verification_code("a@example.com", "123456")
+    assert not verify_code("a@example.com", "000000")
+    assert verify_code("a@example.com", "123456")
+    assert not verify_code("a@example.com", "123456")
+
+
+def test_save_verification_token_replaces_previous_token(temp_db):
+    first = save_verification_token("1234", "alice")
+    assert consume_verification_token(first)
+
+    second = save_verification_token("1234", "alice", message_id="99")
+    assert get_verification_token(first) is None
+    row = get_verification_token(second)
+    assert row["message_id"] == "99"
+    assert not row["used"]
+
+
+def test_save_verification_code_replaces_previous_code(temp_db):
+    save_verification_code("user@example.com", "111111")
+    save_verification_code("user@example.com", "222222")
+
+    assert not verify_code("user@example.com", "111111")
+    assert verify_code("user@example.com", "222222")
+
+
+def test_cached_verification_token_is_dropped_once_consumed(temp_db):
+    token = save_verification_token("1234", "alice")
+    assert get_verification_token(token)
+    assert get_verification_token(token)  # served from the cache
+
+    assert consume_verification_token(token)
+    assert get_verification_token(token) is None
+
+
+def test_cleanup_expired_email_codes_keeps_live_codes(temp_db):
+    save_verification_code("old@example.com", "111111")
+    save_verification_code("new@example.com", "222222")
+    with utils.database.get_writer() as conn:
+        conn.execute(
+            "UPDATE email_codes SET expires_at = 0 WHERE email = ?",
+            ("old@example.com",),
+        )
+
+    assert cleanup_expired_email_codes() == 1
+    assert verify_code("new@example.com", "222222")
+
+
+def test_failed_discord_link_leaves_the_token_usable(temp_db, monkeypatch):
+    token = save_verification_token("1234", "alice")
+    monkeypatch.setattr(auth_service, "get_user_by_email", lambda email: {"id": "rec1"})
+
+    def failing_update_user(user_id, **fields):
+        raise RuntimeError("Teable is down")
+
+    monkeypatch.setattr(auth_service, "update_user", failing_update_user)
+
+    result = auth_service.complete_discord_verification(token, "a@example.com")
+    assert not result["success"]
+    assert get_verification_token(token)
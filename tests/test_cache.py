@@ -0,0 +1,35 @@
+import utils.cache as cache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    ttl_cache = cache.TTLCache(maxsize=10, ttl=30)
+
+    ttl_cache.set("a@hack.sv", {"id": "rec1"})
+    assert ttl_cache.get("a@hack.sv") == {"id": "rec1"}
+
+    now[0] += 31
+    assert ttl_cache.get("a@hack.sv") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    ttl_cache = cache.TTLCache(maxsize=2, ttl=30)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("c") == 3
+
+
+def test_discard_where():
+    ttl_cache = cache.TTLCache(maxsize=10, ttl=30)
+    ttl_cache.set("a", {"id": "rec1"})
+    ttl_cache.set("b", {"id": "rec2"})
+
+    ttl_cache.discard_where(lambda value: value["id"] == "rec1")
+    assert len(ttl_cache) == 1
+    assert ttl_cache.get("b") == {"id": "rec2"}
@@ -0,0 +1,51 @@
+import pytest
+
+import utils.database as database
+
+
+def test_connections_are_reused_and_uncommitted_work_discarded(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE", str(tmp_path / "pool.db"))
+
+    conn = database.get_db_connection()
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    raw = conn._conn
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+
+    conn = database.get_db_connection()
+    assert conn._conn is raw
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    conn.close()
+
+
+def test_context_manager_commits(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE", str(tmp_path / "pool.db"))
+
+    with database.get_db_connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    with database.get_db_connection() as conn:
+        assert conn.execute("SELECT x FROM t").fetchone()["x"] == 1
+
+
+def test_reader_is_read_only_and_writer_is_exclusive(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE", str(tmp_path / "pool.db"))
+    monkeypatch.setattr(database, "DB_BUSY_TIMEOUT", 0.05)
+
+    with database.get_writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+
+        with pytest.raises(database.sqlite3.OperationalError):
+            database.get_writer()
+
+    with database.get_reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        with pytest.raises(database.sqlite3.OperationalError):
+            conn.execute("INSERT INTO t VALUES (2)")
+
+    # Writer is released again after the with-block
+    with database.get_writer() as conn:
+        conn.execute("INSERT INTO t VALUES (2)")
@@ -0,0 +1,73 @@
+import smtplib
+
+import utils.email as email_utils
+
+
+class FakeSMTP:
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.sent = 0
+
+    def __call__(self, host, port):
+        return self
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def send_message(self, msg):
+        outcome = self.outcomes.pop(0)
+        if outcome is not None:
+            raise outcome
+        self.sent += 1
+
+    def quit(self):
+        raise smtplib.SMTPServerDisconnected("gone")
+
+    def close(self):
+        pass
+
+
+class FakeTimer:
+    started = []
+
+    def __init__(self, delay, function, args):
+        self.delay, self.function, self.args = delay, function, args
+
+    def start(self):
+        FakeTimer.started.append(self)
+
+
+def _message():
+    return email_utils._magic_link_message("a@x.com", "https://id.hack.sv/link")
+
+
+def test_failed_quit_after_send_is_not_retried(monkeypatch):
+    smtp = FakeSMTP([None])
+    monkeypatch.setattr(email_utils.smtplib, "SMTP", smtp)
+    monkeypatch.setattr(email_utils.threading, "Timer", FakeTimer)
+    FakeTimer.started = []
+
+    email_utils._deliver_with_retries(_message())
+
+    assert smtp.sent == 1
+    assert FakeTimer.started == []
+
+
+def test_transient_rejection_is_retried_on_a_timer(monkeypatch):
+    smtp = FakeSMTP([smtplib.SMTPDataError(421, b"try later"), None])
+    monkeypatch.setattr(email_utils.smtplib, "SMTP", smtp)
+    monkeypatch.setattr(email_utils.threading, "Timer", FakeTimer)
+    FakeTimer.started = []
+
+    email_utils._deliver_with_retries(_message())
+
+    assert smtp.sent == 0
+    [timer] = FakeTimer.started
+    assert timer.delay == email_utils.MAIL_RETRY_DELAYS[0]
+    assert timer.function == email_utils._mail_pool.submit
+
+    email_utils._deliver_with_retries(*timer.args[1:])
+    assert smtp.sent == 1
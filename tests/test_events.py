@@ -0,0 +1,18 @@
+import os
+import json
+
+import utils.events as events
+
+
+def test_load_events_is_reread_only_when_the_file_changes(tmp_path, monkeypatch):
+    events_file = tmp_path / "events.json"
+    events_file.write_text(json.dumps({"counterspell": {"name": "Counterspell"}}))
+    monkeypatch.setattr(events, "EVENTS_FILE", str(events_file))
+    monkeypatch.setattr(events, "_events_cache", (None, {}))
+
+    first = events.load_events()
+    assert events.load_events() is first
+
+    events_file.write_text(json.dumps({"scrapyard": {"name": "Scrapyard"}}))
+    os.utime(events_file, ns=(0, os.stat(events_file).st_mtime_ns + 1))
+    assert list(events.load_events()) == ["scrapyard"]
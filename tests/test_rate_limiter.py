@@ -0,0 +1,61 @@
+import utils.rate_limiter as rate_limiter
+
+
+class FakeCounter:
+    def __init__(self):
+        self.counts = {}
+        self.calls = 0
+
+    def __call__(self, keys, args):
+        self.calls += 1
+        self.counts[keys[0]] = self.counts.get(keys[0], 0) + 1
+        return self.counts[keys[0]]
+
+
+def test_over_limit_keys_skip_redis(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "get_key_rate_limit", lambda api_key: 2)
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: 1_700_000_000.0)
+    limiter = rate_limiter.APIKeyRateLimiter("redis://unused")
+    counter = FakeCounter()
+    monkeypatch.setattr(limiter, "_get_incr_script", lambda: counter)
+
+    assert limiter.is_allowed("hack.sv.key")[0]
+    assert limiter.is_allowed("hack.sv.key")[0]
+    allowed, info = limiter.is_allowed("hack.sv.key")
+    assert not allowed
+    assert info["rate_limit"] == 2
+
+    # Once the local count reaches the limit, Redis is no longer consulted
+    assert counter.calls == 2
+
+
+def test_unlimited_keys(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "get_key_rate_limit", lambda api_key: 0)
+    limiter = rate_limiter.APIKeyRateLimiter("redis://unused")
+
+    allowed, info = limiter.is_allowed("hack.sv.key")
+    assert allowed
+    assert info["rate_limit"] == "unlimited"
+
+
+def test_redis_is_skipped_for_a_while_after_a_failure(monkeypatch, capsys):
+    monkeypatch.setattr(rate_limiter, "get_key_rate_limit", lambda api_key: 100)
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    limiter = rate_limiter.APIKeyRateLimiter("redis://unused")
+    calls = []
+
+    def failing_counter(keys, args):
+        calls.append(keys)
+        raise rate_limiter.redis.ConnectionError("refused")
+
+    monkeypatch.setattr(limiter, "_get_incr_script", lambda: failing_counter)
+
+    assert limiter.is_allowed("hack.sv.key")[0]
+    assert limiter.is_allowed("hack.sv.key")[1]["current_count"] == 2
+    assert len(calls) == 1
+    assert capsys.readouterr().out.count("Warning") == 1
+
+    now[0] += limiter.REDIS_RETRY_SECONDS
+    assert limiter.is_allowed("hack.sv.key")[0]
+    assert len(calls) == 2
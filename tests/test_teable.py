@@ -0,0 +1,31 @@
+import utils.teable as teable
+
+
+class FakeResponse:
+    def __init__(self, status_code, records=()):
+        self.status_code = status_code
+        self.text = ""
+        self._records = list(records)
+
+    def json(self):
+        return {"records": self._records}
+
+
+def test_get_records_sends_the_projection_and_falls_back_without_it(monkeypatch):
+    monkeypatch.setitem(teable.TEABLE_TABLE_IDS, "users", "tblUsers")
+    sent_params = []
+    responses = [FakeResponse(400), FakeResponse(200, [{"id": "rec1", "fields": {}}])]
+
+    def fake_get(url, headers, params, timeout):
+        sent_params.append(dict(params))
+        return responses.pop(0)
+
+    monkeypatch.setattr(teable._session, "get", fake_get)
+
+    records = teable.get_records("users", limit=1000, fields=["events"])
+
+    assert records == [{"id": "rec1", "fields": {}}]
+    assert sent_params == [
+        {"take": 1000, "skip": 0, "projection[]": ["events"]},
+        {"take": 1000, "skip": 0},
+    ]
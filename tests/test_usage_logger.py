@@ -0,0 +1,15 @@
+import utils.usage_logger as usage_logger
+
+
+def test_queued_entries_are_written_in_one_batch(monkeypatch):
+    batches = []
+    monkeypatch.setattr(usage_logger, "start_usage_logger", lambda: None)
+    monkeypatch.setattr(usage_logger, "log_api_key_usage_batch", batches.append)
+
+    assert usage_logger.enqueue_api_key_usage("hack.sv.a", "api_test", {"method": "GET"})
+    assert usage_logger.enqueue_api_key_usage("hack.sv.b", "api_test")
+    usage_logger.flush_usage_logs()
+
+    assert batches == [
+        [("hack.sv.a", "api_test", {"method": "GET"}), ("hack.sv.b", "api_test", None)]
+    ]
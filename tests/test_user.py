@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+import models.user as user_model
+
+
+def test_get_all_users_decodes_events(monkeypatch):
+    records = [
+        {"id": "rec1", "fields": {"email": "a@x.com", "events": '["counterspell"]'}},
+        {"id": "rec2", "fields": {"email": "b@x.com", "events": ""}},
+        {"id": "rec3", "fields": {"email": "c@x.com"}},
+    ]
+    monkeypatch.setattr(user_model, "get_records", lambda table, limit=None: records)
+
+    users = user_model.get_all_users()
+    assert [u["events"] for u in users] == [["counterspell"], [], []]
+    assert users[0]["email"] == "a@x.com"
+
+
+def test_get_all_users_does_not_shift_events_past_a_bad_row(monkeypatch):
+    records = [
+        {"id": "rec1", "fields": {"email": "a@x.com", "events": '["a"],["b"]'}},
+        {"id": "rec2", "fields": {"email": "b@x.com", "events": '["counterspell"]'}},
+    ]
+    monkeypatch.setattr(user_model, "get_records", lambda table, limit=None: records)
+
+    with pytest.raises(json.JSONDecodeError):
+        user_model.get_all_users()
+
+
+def test_get_users_by_event_only_returns_registered_users(monkeypatch):
+    records = [
+        {"id": "rec1", "fields": {"email": "a@x.com", "events": '["counterspell", "scrapyard"]'}},
+        {"id": "rec2", "fields": {"email": "b@x.com", "events": '["scrapyard-2"]'}},
+        {"id": "rec3", "fields": {"email": "c@x.com"}},
+    ]
+    monkeypatch.setattr(user_model, "get_records", lambda table, limit=None: records)
+
+    users = user_model.get_users_by_event("scrapyard")
+    assert [u["id"] for u in users] == ["rec1"]
+    assert users[0]["events"] == ["counterspell", "scrapyard"]
+
+
+def test_count_users_by_event_counts_each_user_once(monkeypatch):
+    records = [
+        {"id": "rec1", "fields": {"events": '["counterspell", "scrapyard"]'}},
+        {"id": "rec2", "fields": {"events": '["counterspell", "counterspell"]'}},
+    ]
+    requested_fields = []
+
+    def fake_get_records(table, limit=None, fields=None):
+        requested_fields.append(fields)
+        return records
+
+    monkeypatch.setattr(user_model, "get_records", fake_get_records)
+
+    assert user_model.count_users_by_event() == {"counterspell": 2, "scrapyard": 1}
+    assert requested_fields == [["events"]]
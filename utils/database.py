@@ -4,9 +4,202 @@ IMPORTANT: This file provides utilities for SQLite (ephemeral data only).
 For persistent data (users, admins, api_keys, apps), use Teable via models/*.py
 """
 
+import os
+import queue
 import sqlite3
+import pathlib
+import threading
 from config import DATABASE
 
+# Idle connections kept per process; extra connections are opened on demand
+# under bursts and closed instead of pooled when released. Readers are sized
+# to Gunicorn's threads per worker so each request thread can hold one.
+DB_POOL_SIZE = 8
+DB_READER_POOL_SIZE = int(os.getenv("GUNICORN_THREADS", 8))
+
+# Prepared statements kept per connection. Pooled connections live for the
+# whole process, so every distinct hot query stays compiled
+DB_CACHED_STATEMENTS = 256
+
+# Seconds a connection waits on a locked database before raising
+# "database is locked" (sets SQLite's busy_timeout)
+DB_BUSY_TIMEOUT = 5.0
+
+# Persistent, and a no-op once set; read-only connections can't change it
+JOURNAL_MODE_PRAGMA = "PRAGMA journal_mode=WAL"
+
+# Checkpointing is driven by writers, so these only matter on connections
+# that can write
+WRITER_PRAGMAS = (
+    "PRAGMA wal_autocheckpoint=1000",  # checkpoint every ~4MB of WAL (1000 pages)
+    "PRAGMA journal_size_limit=67108864",  # truncate the WAL back to 64MB after a checkpoint
+)
+
+# Per-connection tuning, applied once when a pooled connection is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",  # WAL makes NORMAL durable enough; 1 fsync per commit
+    "PRAGMA mmap_size=268435456",  # 256MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64MB page cache
+    "PRAGMA foreign_keys=ON",
+)
+
+
+def apply_connection_pragmas(conn, read_only=False):
+    """Apply performance PRAGMAs to a SQLite connection."""
+    if read_only:
+        # Also refuse writes at the SQL level, so a write routed through a
+        # reader fails fast instead of waiting on the file lock
+        conn.execute("PRAGMA query_only=ON")
+    else:
+        conn.execute(JOURNAL_MODE_PRAGMA)
+        for pragma in WRITER_PRAGMAS:
+            conn.execute(pragma)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
+class PooledConnection:
+    """
+    A pooled SQLite connection. Behaves like sqlite3.Connection, except that
+    close() hands it back to the pool instead of closing the file.
+    """
+
+    def __init__(self, conn, pool):
+        self._conn = conn
+        self._pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        """Return the connection to the pool, discarding uncommitted work."""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._conn.commit()
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """Thread-safe LIFO pool of configured SQLite connections for one process."""
+
+    def __init__(self, database, size=DB_POOL_SIZE, read_only=False):
+        self.database = database
+        self.read_only = read_only
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        if self.read_only:
+            target = pathlib.Path(self.database).absolute().as_uri() + "?mode=ro"
+        else:
+            target = self.database
+        conn = sqlite3.connect(
+            target,
+            timeout=DB_BUSY_TIMEOUT,
+            cached_statements=DB_CACHED_STATEMENTS,
+            check_same_thread=False,
+            uri=self.read_only,
+        )
+        conn.row_factory = sqlite3.Row
+        apply_connection_pragmas(conn, read_only=self.read_only)
+        return conn
+
+    def acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        return PooledConnection(conn, self)
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class WriterPool(ConnectionPool):
+    """
+    A single read-write connection handed to one thread at a time. Writers
+    queue here instead of spinning on SQLite's busy handler.
+    """
+
+    def __init__(self, database):
+        super().__init__(database, size=1)
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self._lock.acquire(timeout=DB_BUSY_TIMEOUT):
+            raise sqlite3.OperationalError("database is locked")
+        try:
+            return super().acquire()
+        except BaseException:
+            self._lock.release()
+            raise
+
+    def release(self, conn):
+        try:
+            super().release(conn)
+        finally:
+            self._lock.release()
+
+
+class _ProcessPools:
+    """The connection pools one process keeps for one database file."""
+
+    def __init__(self, database):
+        self.database = database
+        self.pid = os.getpid()
+        self.shared = ConnectionPool(database)
+        self.reader = ConnectionPool(database, DB_READER_POOL_SIZE, read_only=True)
+        self.writer = WriterPool(database)
+
+    def is_current(self):
+        return self.pid == os.getpid() and self.database == DATABASE
+
+    def close_all(self):
+        for pool in (self.shared, self.reader, self.writer):
+            pool.close_all()
+
+
+_pools = None
+_pools_lock = threading.Lock()
+
+
+def _get_pools():
+    """Return this process's pools, rebuilding them after a fork or DB path change."""
+    global _pools
+
+    pools = _pools
+    if pools is not None and pools.is_current():
+        return pools
+
+    with _pools_lock:
+        pools = _pools
+        if pools is None or not pools.is_current():
+            # Connections inherited across a fork must not be reused
+            if pools is not None and pools.pid == os.getpid():
+                pools.close_all()
+            pools = _pools = _ProcessPools(DATABASE)
+        return pools
+
 
 def get_db_connection():
     """
@@ -19,11 +212,29 @@ def get_db_connection():
     - oauth_tokens
     - api_key_logs
 
+    Connections come from a per-process pool; call close() (or use it as a
+    context manager, which commits on success) to give it back. Model code
+    should prefer get_reader()/get_writer().
+
     For persistent data, use Teable via models/*.py
     """
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return _get_pools().shared.acquire()
+
+
+def get_reader():
+    """
+    Get a read-only pooled connection for SELECTs. With WAL, readers never
+    block each other or the writer. Use as a context manager.
+    """
+    return _get_pools().reader.acquire()
+
+
+def get_writer():
+    """
+    Get this process's single read-write connection, waiting for any other
+    thread using it. Use as a context manager; it commits on success.
+    """
+    return _get_pools().writer.acquire()
 
 
 def dict_factory(cursor, row):
@@ -19,12 +19,20 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import DATABASE
+from utils.database import apply_connection_pragmas, get_reader, DB_BUSY_TIMEOUT
 
 
 def init_db():
     """Initialize SQLite database with ephemeral tables only."""
     try:
-        conn = sqlite3.connect(DATABASE)
+        # Wait on a lock held by a running app instead of failing at startup
+        conn = sqlite3.connect(DATABASE, timeout=DB_BUSY_TIMEOUT)
+        # Lets the background sweeper hand freed pages back with
+        # incremental_vacuum; takes effect on new files (see below for old ones)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # Includes journal_mode=WAL, which lets readers proceed while a writer
+        # commits; the mode persists in the database file
+        apply_connection_pragmas(conn)
         cursor = conn.cursor()
         print(f"📂 Initializing SQLite (ephemeral data): {DATABASE}")
     except Exception as e:
@@ -37,10 +45,13 @@ def init_db():
         CREATE TABLE IF NOT EXISTS email_codes (
             email TEXT PRIMARY KEY,
             code TEXT NOT NULL,
-            expires_at TIMESTAMP NOT NULL
+            expires_at INTEGER NOT NULL  -- Unix epoch seconds
         )
     """
     )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_email_codes_expires ON email_codes(expires_at)"
+    )
     print("  ✓ email_codes table")
 
     # Discord verification tokens table (EPHEMERAL)
@@ -51,11 +62,32 @@ def init_db():
             discord_id TEXT NOT NULL,
             discord_username TEXT,
             message_id TEXT,
-            expires_at TIMESTAMP NOT NULL,
+            expires_at INTEGER NOT NULL,  -- Unix epoch seconds
             used BOOLEAN DEFAULT FALSE
         )
     """
     )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_verification_tokens_expires ON verification_tokens(expires_at)"
+    )
+    # One live token per Discord user; save_verification_token upserts on this.
+    # Drop any older duplicates first so existing databases can take the index.
+    cursor.execute(
+        """
+        DELETE FROM verification_tokens WHERE rowid NOT IN (
+            SELECT MAX(rowid) FROM verification_tokens GROUP BY discord_id
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_verification_tokens_discord_id ON verification_tokens(discord_id)"
+    )
+    # Older databases stored these expiry times as text timestamps
+    for table in ("email_codes", "verification_tokens"):
+        cursor.execute(
+            f"UPDATE {table} SET expires_at = CAST(strftime('%s', expires_at) AS INTEGER) "
+            "WHERE typeof(expires_at) = 'text'"
+        )
     print("  ✓ verification_tokens table")
 
     # Opt-out tokens table for permanent secure deletion links (EPHEMERAL)
@@ -90,10 +122,17 @@ def init_db():
             key_id TEXT NOT NULL,
             timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             action TEXT NOT NULL,
-            metadata TEXT DEFAULT '{}'
+            metadata TEXT DEFAULT '{}'  -- msgpack BLOB when non-empty
         )
     """
     )
+    # get_api_key_logs reads newest-first, per key or across all keys
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_api_key_logs_key_timestamp ON api_key_logs(key_id, timestamp DESC)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_api_key_logs_timestamp ON api_key_logs(timestamp)"
+    )
     print("  ✓ api_key_logs table")
 
     # OAuth 2.0 authorization codes table (EPHEMERAL)
@@ -162,10 +201,19 @@ def init_db():
     cursor.execute(
         "CREATE INDEX IF NOT EXISTS idx_oauth_tokens_expires ON oauth_tokens(expires_at)"
     )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_oauth_tokens_user ON oauth_tokens(user_email)"
+    )
     print("  ✓ oauth_tokens table (legacy)")
 
     try:
         conn.commit()
+
+        # Existing files only switch auto_vacuum mode after a full VACUUM
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conn.execute("VACUUM")
+            print("  ✓ switched to incremental auto_vacuum")
+
         conn.close()
         print("✅ SQLite (ephemeral data) initialized successfully!")
         print("ℹ️  Persistent data (users, admins, api_keys, apps) is in Teable")
@@ -178,14 +226,11 @@ def init_db():
 def check_table_exists(table_name):
     """Check if a specific table exists in the database."""
     try:
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-            (table_name,),
-        )
-        result = cursor.fetchone()
-        conn.close()
+        with get_reader() as conn:
+            result = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                (table_name,),
+            ).fetchone()
         exists = result is not None
         print(f"Table '{table_name}' exists: {exists}")
         return exists
@@ -197,11 +242,11 @@ def check_table_exists(table_name):
 def list_all_tables():
     """List all tables in the database."""
     try:
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        with get_reader() as conn:
+            rows = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+            ).fetchall()
+        tables = [row[0] for row in rows]
         print(f"All tables in database: {tables}")
         return tables
     except Exception as e:
@@ -1,25 +1,66 @@
 """Discord utilities and bot integration."""
 
-import requests
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.http import make_session
 from config import DISCORD_BOT_TOKEN, DISCORD_GUILD_ID, DEBUG_MODE
 
+# Shared session so Discord API calls reuse pooled TCP/TLS connections
+_session = make_session(pool_connections=2, pool_maxsize=16)
+
+# Role changes for one user are independent calls, so they are sent a few at
+# a time rather than one after another
+_role_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="discord")
+
+
+# Seconds before a Discord API call is abandoned, so one stalled request
+# can't hold a _role_pool thread (and everyone queued behind it) forever
+DISCORD_TIMEOUT = 10
+
+# A rate-limited role call is retried after Discord's retry_after as long as
+# that wait is short; longer limits are reported as a failure
+DISCORD_MAX_RATE_LIMIT_RETRIES = 2
+DISCORD_MAX_RETRY_AFTER = 5
 
-def assign_discord_role(discord_id, role_id):
-    """Assign a Discord role to a user."""
-    if not DISCORD_BOT_TOKEN:
-        if DEBUG_MODE:
-            print("WARNING: Discord bot token not configured. Role not assigned.")
-        return False
 
+def map_role_calls(role_call, discord_id, role_ids):
+    """Run role_call(discord_id, role_id) for each role concurrently; results keep role_ids order."""
+    return list(_role_pool.map(lambda role_id: role_call(discord_id, role_id), role_ids))
+
+
+def _role_request(method, discord_id, role_id):
+    """Send a PUT/DELETE for one member role, waiting out short 429s."""
     url = f"https://discord.com/api/v10/guilds/{DISCORD_GUILD_ID}/members/{discord_id}/roles/{role_id}"
     headers = {
         "Authorization": f"Bot {DISCORD_BOT_TOKEN}",
         "Content-Type": "application/json",
     }
 
+    for attempt in range(DISCORD_MAX_RATE_LIMIT_RETRIES + 1):
+        response = _session.request(method, url, headers=headers, timeout=DISCORD_TIMEOUT)
+        if response.status_code != 429 or attempt == DISCORD_MAX_RATE_LIMIT_RETRIES:
+            return response
+        try:
+            retry_after = float(response.json().get("retry_after", 0))
+        except ValueError:
+            retry_after = float(response.headers.get("Retry-After", 0))
+        if retry_after > DISCORD_MAX_RETRY_AFTER:
+            return response
+        if DEBUG_MODE:
+            print(f"Discord rate limited role {role_id}; retrying in {retry_after}s")
+        time.sleep(retry_after)
+
+
+def assign_discord_role(discord_id, role_id):
+    """Assign a Discord role to a user."""
+    if not DISCORD_BOT_TOKEN:
+        if DEBUG_MODE:
+            print("WARNING: Discord bot token not configured. Role not assigned.")
+        return False
+
     try:
-        response = requests.put(url, headers=headers)
+        response = _role_request("PUT", discord_id, role_id)
         if response.status_code == 204:
             if DEBUG_MODE:
                 print(f"Successfully assigned role {role_id} to user {discord_id}")
@@ -43,14 +84,8 @@ def remove_discord_role(discord_id, role_id):
             print("WARNING: Discord bot token not configured. Role not removed.")
         return False
 
-    url = f"https://discord.com/api/v10/guilds/{DISCORD_GUILD_ID}/members/{discord_id}/roles/{role_id}"
-    headers = {
-        "Authorization": f"Bot {DISCORD_BOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-
     try:
-        response = requests.delete(url, headers=headers)
+        response = _role_request("DELETE", discord_id, role_id)
         if response.status_code == 204:
             if DEBUG_MODE:
                 print(f"Successfully removed role {role_id} from user {discord_id}")
@@ -84,31 +119,18 @@ def remove_all_event_roles(discord_id):
 
         events = get_all_events()
 
-        removed_roles = []
-        failed_roles = []
-
-        # Remove Hacker role first
+        # Hacker role plus all event roles (both legacy and non-legacy)
+        roles = []
         hacker_role_id = get_hacker_role_id()
         if hacker_role_id:
-            success = remove_discord_role(discord_id, hacker_role_id)
-            if success:
-                removed_roles.append(
-                    {
-                        "event_id": "_hacker",
-                        "event_name": "Hacker",
-                        "role_id": hacker_role_id,
-                    }
-                )
-            else:
-                failed_roles.append(
-                    {
-                        "event_id": "_hacker",
-                        "event_name": "Hacker",
-                        "role_id": hacker_role_id,
-                    }
-                )
+            roles.append(
+                {
+                    "event_id": "_hacker",
+                    "event_name": "Hacker",
+                    "role_id": hacker_role_id,
+                }
+            )
 
-        # Remove all event roles (both legacy and non-legacy)
         for event_id, event_data in events.items():
             # Skip the _config entry
             if event_id.startswith("_"):
@@ -116,23 +138,19 @@ def remove_all_event_roles(discord_id):
 
             role_id = event_data.get("discord-role-id")
             if role_id:
-                success = remove_discord_role(discord_id, role_id)
-                if success:
-                    removed_roles.append(
-                        {
-                            "event_id": event_id,
-                            "event_name": event_data.get("name", event_id),
-                            "role_id": role_id,
-                        }
-                    )
-                else:
-                    failed_roles.append(
-                        {
-                            "event_id": event_id,
-                            "event_name": event_data.get("name", event_id),
-                            "role_id": role_id,
-                        }
-                    )
+                roles.append(
+                    {
+                        "event_id": event_id,
+                        "event_name": event_data.get("name", event_id),
+                        "role_id": role_id,
+                    }
+                )
+
+        results = map_role_calls(
+            remove_discord_role, discord_id, [role["role_id"] for role in roles]
+        )
+        removed_roles = [role for role, ok in zip(roles, results) if ok]
+        failed_roles = [role for role, ok in zip(roles, results) if not ok]
 
         return {
             "success": len(failed_roles) == 0,
@@ -167,7 +185,7 @@ def get_discord_user_info(discord_id):
     }
 
     try:
-        response = requests.get(url, headers=headers)
+        response = _session.get(url, headers=headers, timeout=DISCORD_TIMEOUT)
         if response.status_code == 200:
             member_data = response.json()
             if DEBUG_MODE:
@@ -204,7 +222,7 @@ def get_discord_user_direct(discord_id):
     }
 
     try:
-        response = requests.get(url, headers=headers)
+        response = _session.get(url, headers=headers, timeout=DISCORD_TIMEOUT)
         if response.status_code == 200:
             user_data = response.json()
             if DEBUG_MODE:
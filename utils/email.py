@@ -1,6 +1,8 @@
 """Email utilities using AWS SES SMTP."""
 
 import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from config import (
@@ -13,6 +15,87 @@ from config import (
     DEBUG_MODE,
 )
 
+# Background pool so requests don't wait on the SMTP round trip
+_mail_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="mail")
+
+# Seconds to wait before each retry of a failed background send. The user has
+# already been told the link is on its way, so a transient SMTP error
+# shouldn't be the end of it; the link stays valid for 10 minutes.
+MAIL_RETRY_DELAYS = (5, 30)
+
+
+class _RetryableMailError(Exception):
+    """SES didn't accept the message, so sending it again can't duplicate it."""
+
+
+def _deliver(msg):
+    """
+    Hand msg to AWS SES over SMTP.
+    Raises _RetryableMailError when connecting or logging in fails, or SES
+    answers the message with a transient (4xx) reply, so it wasn't accepted;
+    other errors propagate as-is.
+    """
+    # Connect to AWS SES SMTP server
+    server = None
+    try:
+        server = smtplib.SMTP(MAIL_HOST, MAIL_PORT)
+        server.starttls()
+        server.login(MAIL_USERNAME, MAIL_PASSWORD)
+    except OSError as e:  # smtplib errors are OSErrors too
+        if server is not None:
+            server.close()
+        # Refused, timed out, dropped or a 4xx reply; a 5xx such as bad
+        # credentials won't fix itself
+        if isinstance(e, smtplib.SMTPResponseException) and e.smtp_code >= 500:
+            raise
+        raise _RetryableMailError(str(e)) from e
+
+    try:
+        # Send email
+        server.send_message(msg)
+    except smtplib.SMTPResponseException as e:
+        server.close()
+        # A 4xx reply means SES turned the message away for now
+        if 400 <= e.smtp_code < 500:
+            raise _RetryableMailError(str(e)) from e
+        raise
+    except Exception:
+        # e.g. a dropped connection mid-send, when SES may already have it
+        server.close()
+        raise
+
+    # The message is already accepted; a failed goodbye isn't a failed send
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
+
+
+def _deliver_with_retries(msg, attempt=0):
+    """
+    Deliver msg on the mail pool, scheduling a retry after the next
+    MAIL_RETRY_DELAYS entry if it fails before SES accepted it.
+    """
+    try:
+        _deliver(msg)
+    except _RetryableMailError as e:
+        if attempt < len(MAIL_RETRY_DELAYS):
+            # Wait on a timer rather than sleeping in (and holding) a pool thread
+            timer = threading.Timer(
+                MAIL_RETRY_DELAYS[attempt],
+                _mail_pool.submit,
+                args=(_deliver_with_retries, msg, attempt + 1),
+            )
+            timer.daemon = True
+            timer.start()
+            return
+        print(f"Giving up on email to {msg['To']} after {attempt + 1} attempts: {e}")
+    except Exception as e:
+        print(f"Error sending email to {msg['To']}: {e}")
+    else:
+        if DEBUG_MODE:
+            print(f"Email sent successfully to {msg['To']}")
+
 
 def send_verification_email(to_email, verification_code):
     """Send verification email to user."""
@@ -38,14 +121,7 @@ def send_verification_email(to_email, verification_code):
     msg.attach(html_part)
 
     try:
-        # Connect to AWS SES SMTP server
-        server = smtplib.SMTP(MAIL_HOST, MAIL_PORT)
-        server.starttls()
-        server.login(MAIL_USERNAME, MAIL_PASSWORD)
-
-        # Send email
-        server.send_message(msg)
-        server.quit()
+        _deliver(msg)
 
         if DEBUG_MODE:
             print(f"Email sent successfully to {to_email}")
@@ -55,17 +131,8 @@ def send_verification_email(to_email, verification_code):
         return False
 
 
-def send_magic_link_email(to_email, magic_link):
-    """Send magic link email to user for passwordless authentication."""
-    if not MAIL_USERNAME or not MAIL_PASSWORD:
-        print("WARNING: AWS SES credentials not configured. Magic link email not sent.")
-        if DEBUG_MODE:
-            print(f"\n==== DEBUG: Magic Link (Email not sent) ====")
-            print(f"To: {to_email}")
-            print(f"Magic Link: {magic_link}")
-            print(f"============================================\n")
-        return False
-
+def _magic_link_message(to_email, magic_link):
+    """Build the magic link email for to_email."""
     # Create message
     msg = MIMEMultipart("alternative")
     msg["Subject"] = "Your Sign-In Link for hack.sv"
@@ -119,16 +186,24 @@ If you didn't request this email, you can safely ignore it.
     html_part = MIMEText(html_content, "html")
     msg.attach(text_part)
     msg.attach(html_part)
+    return msg
 
-    try:
-        # Connect to AWS SES SMTP server
-        server = smtplib.SMTP(MAIL_HOST, MAIL_PORT)
-        server.starttls()
-        server.login(MAIL_USERNAME, MAIL_PASSWORD)
 
-        # Send email
-        server.send_message(msg)
-        server.quit()
+def send_magic_link_email(to_email, magic_link):
+    """Send magic link email to user for passwordless authentication."""
+    if not MAIL_USERNAME or not MAIL_PASSWORD:
+        print("WARNING: AWS SES credentials not configured. Magic link email not sent.")
+        if DEBUG_MODE:
+            print(f"\n==== DEBUG: Magic Link (Email not sent) ====")
+            print(f"To: {to_email}")
+            print(f"Magic Link: {magic_link}")
+            print(f"============================================\n")
+        return False
+
+    msg = _magic_link_message(to_email, magic_link)
+
+    try:
+        _deliver(msg)
 
         if DEBUG_MODE:
             print(f"Magic link email sent successfully to {to_email}")
@@ -144,6 +219,20 @@ If you didn't request this email, you can safely ignore it.
         return False
 
 
+def send_magic_link_email_async(to_email, magic_link):
+    """
+    Send the magic link email on a background thread.
+    Returns False immediately if SMTP isn't configured, otherwise True once queued.
+    Sends that fail before SES accepts them are retried after
+    MAIL_RETRY_DELAYS; other failures are logged.
+    """
+    if not MAIL_USERNAME or not MAIL_PASSWORD:
+        return send_magic_link_email(to_email, magic_link)
+
+    _mail_pool.submit(_deliver_with_retries, _magic_link_message(to_email, magic_link))
+    return True
+
+
 def send_admin_notification(subject, content):
     """Send notification email to admin."""
     if not MAIL_USERNAME or not MAIL_PASSWORD:
@@ -163,14 +252,7 @@ def send_admin_notification(subject, content):
     msg.attach(html_part)
 
     try:
-        # Connect to AWS SES SMTP server
-        server = smtplib.SMTP(MAIL_HOST, MAIL_PORT)
-        server.starttls()
-        server.login(MAIL_USERNAME, MAIL_PASSWORD)
-
-        # Send email
-        server.send_message(msg)
-        server.quit()
+        _deliver(msg)
 
         if DEBUG_MODE:
             print(f"Admin notification sent to {EMAIL_SENDER}")
@@ -11,11 +11,26 @@ EVENTS_FILE = os.path.join(
 )
 
 
+# Parsed events.json as (mtime_ns, events). Role and event lookups run several
+# times per request, so the file is only re-read when it changes on disk.
+# Callers must treat the returned dict as read-only.
+_events_cache = (None, {})
+
+
 def load_events():
-    """Load events from events.json file."""
+    """Load events from events.json file, reusing the parsed copy until it changes."""
+    global _events_cache
+
     try:
+        mtime = os.stat(EVENTS_FILE).st_mtime_ns
+        cached_mtime, events = _events_cache
+        if cached_mtime == mtime:
+            return events
+
         with open(EVENTS_FILE, "r") as f:
-            return json.load(f)
+            events = json.load(f)
+        _events_cache = (mtime, events)
+        return events
     except FileNotFoundError:
         if DEBUG_MODE:
             print(f"WARNING: Events file not found at {EVENTS_FILE}")
@@ -167,8 +182,8 @@ def add_event(event_id, event_data):
     if not is_valid:
         return False, message
 
-    # Load current events
-    events = load_events()
+    # Copy, since load_events() hands out the shared cached dict
+    events = dict(load_events())
 
     # Check if event already exists
     if event_id in events:
@@ -193,8 +208,8 @@ def update_event(event_id, event_data):
     if not is_valid:
         return False, message
 
-    # Load current events
-    events = load_events()
+    # Copy, since load_events() hands out the shared cached dict
+    events = dict(load_events())
 
     # Check if event exists
     if event_id not in events:
@@ -0,0 +1,82 @@
+"""Background sweep of expired rows in the ephemeral SQLite tables.
+
+Codes and tokens are only rejected (not removed) once they expire, so
+without a sweep these tables grow forever. A daemon thread per worker
+deletes expired rows every few minutes using the expires_at indexes.
+"""
+
+import os
+import time
+import threading
+from config import DEBUG_MODE
+from utils.database import get_writer
+from models.auth import cleanup_expired_email_codes, cleanup_expired_verification_tokens
+from models.oauth import cleanup_expired_codes, cleanup_expired_tokens
+from models.oauth_token import cleanup_expired_oauth_tokens
+
+SWEEP_INTERVAL = 300  # seconds
+VACUUM_INTERVAL = 24 * 60 * 60  # seconds
+
+_CLEANUPS = (
+    cleanup_expired_email_codes,
+    cleanup_expired_verification_tokens,
+    cleanup_expired_codes,
+    cleanup_expired_tokens,
+    cleanup_expired_oauth_tokens,
+)
+
+_worker_lock = threading.Lock()
+_worker_pid = None
+
+
+def sweep_expired_rows() -> int:
+    """Run every cleanup once; one failing table doesn't stop the others."""
+    deleted = 0
+    for cleanup in _CLEANUPS:
+        try:
+            deleted += cleanup() or 0
+        except Exception as e:
+            print(f"Warning: Expired row cleanup {cleanup.__name__} failed: {e}")
+
+    if DEBUG_MODE and deleted:
+        print(f"DEBUG: Swept {deleted} expired rows")
+    return deleted
+
+
+def reclaim_free_pages():
+    """Give pages freed by the sweeps back to the filesystem (auto_vacuum=INCREMENTAL)."""
+    try:
+        with get_writer() as conn:
+            # Each step frees a page, so the statement has to be run to completion
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+    except Exception as e:
+        print(f"Warning: Incremental vacuum failed: {e}")
+
+
+def _sweep_worker():
+    """Sweep forever, sleeping between passes, and vacuum about once a day."""
+    last_vacuum = time.monotonic()
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        sweep_expired_rows()
+
+        if time.monotonic() - last_vacuum >= VACUUM_INTERVAL:
+            reclaim_free_pages()
+            last_vacuum = time.monotonic()
+
+
+def start_expiry_sweeper():
+    """Start the sweeper for this process if it isn't running."""
+    global _worker_pid
+
+    # Threads don't survive a fork, so each Gunicorn worker starts its own
+    if _worker_pid == os.getpid():
+        return
+
+    with _worker_lock:
+        if _worker_pid == os.getpid():
+            return
+
+        worker = threading.Thread(target=_sweep_worker, daemon=True)
+        worker.start()
+        _worker_pid = os.getpid()
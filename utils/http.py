@@ -0,0 +1,24 @@
+"""Shared setup for the pooled HTTP sessions used to call upstream APIs."""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Pooled keep-alive connections can be closed by the server between requests;
+# the next request on one then fails before anything is processed. Retry
+# those once or twice (idempotent methods only, urllib3's default) instead
+# of surfacing the error.
+_RETRY = Retry(total=2, read=1, backoff_factor=0.3)
+
+
+def make_session(pool_connections, pool_maxsize, schemes=("https://",)):
+    """Create a requests.Session with a pooled, retrying adapter mounted."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=_RETRY,
+    )
+    for scheme in schemes:
+        session.mount(scheme, adapter)
+    return session
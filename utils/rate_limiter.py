@@ -1,21 +1,85 @@
 """Per-API-key rate limiting utilities."""
 
 import time
+import hashlib
 import threading
-from collections import defaultdict, deque
+from functools import wraps
+from collections import OrderedDict
 from typing import Dict, Optional
+import redis
+from config import REDIS_URL
 from models.api_key import get_key_rate_limit
 
+# Atomic fixed-window counter: increment and set the expiry on first hit.
+_INCR_WITH_EXPIRY = """
+local c = redis.call('INCR', KEYS[1])
+if c == 1 then redis.call('EXPIRE', KEYS[1], ARGV[1]) end
+return c
+"""
+
 
 class APIKeyRateLimiter:
     """
-    In-memory rate limiter for API keys using sliding window approach.
+    Redis-backed rate limiter for API keys using a fixed one-minute window.
     Each API key has its own rate limit (RPM) that can be configured.
+
+    Counters live in Redis so limits hold across Gunicorn workers and expire
+    on their own. A small per-process LRU of the latest counts lets keys that
+    are already over their limit be rejected without a Redis round trip.
     """
 
-    def __init__(self):
-        self._requests = defaultdict(deque)  # api_key -> deque of timestamps
+    WINDOW_SECONDS = 60
+
+    # After a Redis error, skip Redis (and the connect timeout) for this long
+    # and count per worker instead; the failure is logged once per period
+    REDIS_RETRY_SECONDS = 30
+
+    def __init__(self, redis_url: str, local_cache_size: int = 1024):
+        self._redis_url = redis_url
+        self._redis = None
+        self._incr = None
+        self._local_counts = OrderedDict()  # bucket key -> last known count
+        self._local_cache_size = local_cache_size
         self._lock = threading.Lock()
+        self._redis_down_until = 0.0  # time.monotonic() deadline
+
+    def _get_incr_script(self):
+        """Lazily connect to Redis and register the counter script (EVALSHA)."""
+        if self._incr is None:
+            self._redis = redis.Redis.from_url(
+                self._redis_url, socket_connect_timeout=1, socket_timeout=1
+            )
+            self._incr = self._redis.register_script(_INCR_WITH_EXPIRY)
+        return self._incr
+
+    def _redis_available(self) -> bool:
+        """False while backing off after a recent Redis failure."""
+        return time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, action: str, error: Exception):
+        """Start a back-off period, logging only its first failure."""
+        with self._lock:
+            if time.monotonic() < self._redis_down_until:
+                return
+            self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+        print(
+            f"Warning: Redis {action} failed: {error} "
+            f"(using per-worker counts for {self.REDIS_RETRY_SECONDS}s)"
+        )
+
+    def _bucket_key(self, api_key: str, window: int) -> str:
+        """Redis key for an API key's counter in the given window."""
+        digest = hashlib.blake2b(api_key.encode("utf-8")).hexdigest()[:16]
+        return f"rl:{digest}:{window}"
+
+    def _remember(self, bucket: str, count: int):
+        """Record the latest count for a bucket in the local LRU."""
+        with self._lock:
+            previous = self._local_counts.get(bucket, 0)
+            self._local_counts[bucket] = max(previous, count)
+            self._local_counts.move_to_end(bucket)
+            while len(self._local_counts) > self._local_cache_size:
+                self._local_counts.popitem(last=False)
 
     def is_allowed(self, api_key: str) -> tuple[bool, Dict]:
         """
@@ -25,110 +89,100 @@ class APIKeyRateLimiter:
             tuple: (is_allowed: bool, info: dict)
             info contains: rate_limit, current_count, reset_time
         """
-        with self._lock:
-            # Get rate limit for this API key
-            rate_limit_rpm = get_key_rate_limit(api_key)
-
-            if rate_limit_rpm <= 0:
-                # Unlimited rate limit
-                return True, {
-                    "rate_limit": "unlimited",
-                    "current_count": 0,
-                    "reset_time": None,
-                }
-
-            current_time = time.time()
-            window_start = current_time - 60  # 60 seconds window for RPM
+        # Get rate limit for this API key
+        rate_limit_rpm = get_key_rate_limit(api_key)
+
+        if rate_limit_rpm <= 0:
+            # Unlimited rate limit
+            return True, {
+                "rate_limit": "unlimited",
+                "current_count": 0,
+                "reset_time": None,
+            }
 
-            # Get or create request queue for this API key
-            request_queue = self._requests[api_key]
+        window = int(time.time()) // self.WINDOW_SECONDS
+        reset_time = (window + 1) * self.WINDOW_SECONDS
+        bucket = self._bucket_key(api_key, window)
 
-            # Remove old requests outside the window
-            while request_queue and request_queue[0] < window_start:
-                request_queue.popleft()
+        # Already over the limit in this window: reject without touching Redis
+        with self._lock:
+            local_count = self._local_counts.get(bucket, 0)
+        if local_count >= rate_limit_rpm:
+            return False, {
+                "rate_limit": rate_limit_rpm,
+                "current_count": local_count,
+                "reset_time": reset_time,
+            }
 
-            current_count = len(request_queue)
+        # Redis unavailable: fall back to this worker's own count
+        count = local_count + 1
+        if self._redis_available():
+            try:
+                count = int(
+                    self._get_incr_script()(keys=[bucket], args=[self.WINDOW_SECONDS])
+                )
+            except redis.RedisError as e:
+                self._redis_failed("rate limit check", e)
+
+        self._remember(bucket, count)
+
+        if count <= rate_limit_rpm:
+            return True, {
+                "rate_limit": rate_limit_rpm,
+                "current_count": count,
+                "reset_time": reset_time,
+            }
 
-            # Check if we're under the limit
-            if current_count < rate_limit_rpm:
-                # Add current request timestamp
-                request_queue.append(current_time)
-                return True, {
-                    "rate_limit": rate_limit_rpm,
-                    "current_count": current_count + 1,
-                    "reset_time": int(
-                        window_start + 60
-                    ),  # When the oldest request will expire
-                }
-            else:
-                # Rate limit exceeded
-                return False, {
-                    "rate_limit": rate_limit_rpm,
-                    "current_count": current_count,
-                    "reset_time": int(
-                        request_queue[0] + 60
-                    ),  # When the oldest request will expire
-                }
+        # Rate limit exceeded
+        return False, {
+            "rate_limit": rate_limit_rpm,
+            "current_count": rate_limit_rpm,
+            "reset_time": reset_time,
+        }
 
     def get_stats(self, api_key: str) -> Dict:
         """Get current rate limiting stats for an API key."""
+        rate_limit_rpm = get_key_rate_limit(api_key)
+        window = int(time.time()) // self.WINDOW_SECONDS
+        bucket = self._bucket_key(api_key, window)
+
         with self._lock:
-            rate_limit_rpm = get_key_rate_limit(api_key)
-            current_time = time.time()
-            window_start = current_time - 60
-
-            request_queue = self._requests[api_key]
-
-            # Remove old requests
-            while request_queue and request_queue[0] < window_start:
-                request_queue.popleft()
-
-            current_count = len(request_queue)
-
-            return {
-                "rate_limit": rate_limit_rpm if rate_limit_rpm > 0 else "unlimited",
-                "current_count": current_count,
-                "remaining": (
-                    max(0, rate_limit_rpm - current_count)
-                    if rate_limit_rpm > 0
-                    else "unlimited"
-                ),
-                "reset_time": (
-                    int(request_queue[0] + 60)
-                    if request_queue
-                    else int(current_time + 60)
-                ),
-            }
+            current_count = self._local_counts.get(bucket, 0)
+        if self._redis_available():
+            try:
+                self._get_incr_script()
+                current_count = int(self._redis.get(bucket) or 0)
+            except redis.RedisError as e:
+                self._redis_failed("rate limit stats", e)
+
+        return {
+            "rate_limit": rate_limit_rpm if rate_limit_rpm > 0 else "unlimited",
+            "current_count": current_count,
+            "remaining": (
+                max(0, rate_limit_rpm - current_count)
+                if rate_limit_rpm > 0
+                else "unlimited"
+            ),
+            "reset_time": (window + 1) * self.WINDOW_SECONDS,
+        }
 
     def reset_key(self, api_key: str):
         """Reset rate limiting for a specific API key (admin function)."""
-        with self._lock:
-            if api_key in self._requests:
-                del self._requests[api_key]
+        window = int(time.time()) // self.WINDOW_SECONDS
+        bucket = self._bucket_key(api_key, window)
 
-    def cleanup_old_entries(self):
-        """Clean up old entries to prevent memory leaks."""
         with self._lock:
-            current_time = time.time()
-            window_start = current_time - 60
-
-            keys_to_remove = []
-            for api_key, request_queue in self._requests.items():
-                # Remove old requests
-                while request_queue and request_queue[0] < window_start:
-                    request_queue.popleft()
+            self._local_counts.pop(bucket, None)
 
-                # If queue is empty, mark key for removal
-                if not request_queue:
-                    keys_to_remove.append(api_key)
-
-            # Remove empty queues
-            for api_key in keys_to_remove:
-                del self._requests[api_key]
+        try:
+            self._get_incr_script()
+            self._redis.delete(bucket)
+        except redis.RedisError as e:
+            self._redis_failed("rate limit reset", e)
 
 
 # Global rate limiter instance
-api_rate_limiter = APIKeyRateLimiter()
+api_rate_limiter = APIKeyRateLimiter(REDIS_URL)
 
 
 def check_api_key_rate_limit(api_key: str) -> tuple[bool, Dict]:
@@ -151,26 +205,6 @@ def reset_api_key_rate_limit(api_key: str):
     api_rate_limiter.reset_key(api_key)
 
 
-def cleanup_rate_limiter():
-    """Clean up old rate limiting entries."""
-    api_rate_limiter.cleanup_old_entries()
-
-
-# Background cleanup function (can be called periodically)
-def start_cleanup_thread():
-    """Start a background thread to clean up old rate limiting entries."""
-    import threading
-    import time
-
-    def cleanup_worker():
-        while True:
-            time.sleep(300)  # Clean up every 5 minutes
-            cleanup_rate_limiter()
-
-    cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
-    cleanup_thread.start()
-
-
 # Rate limiting decorator for API endpoints
 def rate_limit_api_key(f):
     """
@@ -178,7 +212,6 @@ def rate_limit_api_key(f):
     Should be used after the API key authentication decorator.
     Disabled in development mode.
     """
-    from functools import wraps
     from flask import request, jsonify, g
     from config import DEBUG_MODE
 
@@ -189,8 +222,8 @@ def rate_limit_api_key(f):
             return f(*args, **kwargs)
 
         # Get API key from request headers
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
+        auth_header = request.environ.get("HTTP_AUTHORIZATION", "")
+        if not auth_header.startswith("Bearer "):
             # No API key, let the auth decorator handle it
             return f(*args, **kwargs)
 
@@ -1,9 +1,9 @@
 """Teable database integration utilities."""
 
 import os
-import requests
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
+from utils.http import make_session
 
 # Load environment variables
 load_dotenv()
@@ -22,6 +22,12 @@ TEABLE_TABLE_IDS = {
     'apps': os.getenv('TEABLE_TABLE_APPS'),
 }
 
+# Seconds to wait on Teable before giving up (a hung request would pin a worker)
+TEABLE_TIMEOUT = 15
+
+# Shared session so Teable calls reuse pooled TCP/TLS connections
+_session = make_session(pool_connections=4, pool_maxsize=16)
+
 
 def get_headers():
     """Get API headers for Teable requests."""
@@ -74,7 +80,7 @@ def create_record(table_name: str, record: Dict[str, Any]) -> Optional[Dict[str,
         "records": [{"fields": record}]
     }
 
-    response = requests.post(url, headers=get_headers(), json=payload)
+    response = _session.post(url, headers=get_headers(), json=payload, timeout=TEABLE_TIMEOUT)
 
     if response.status_code in [200, 201]:
         return response.json()
@@ -109,7 +115,7 @@ def create_records_batch(table_name: str, records: List[Dict[str, Any]]) -> Opti
         "records": formatted_records
     }
 
-    response = requests.post(url, headers=get_headers(), json=payload)
+    response = _session.post(url, headers=get_headers(), json=payload, timeout=TEABLE_TIMEOUT)
 
     if response.status_code in [200, 201]:
         return response.json()
@@ -120,7 +126,12 @@ def create_records_batch(table_name: str, records: List[Dict[str, Any]]) -> Opti
         return None
 
 
-def get_records(table_name: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+def get_records(
+    table_name: str,
+    limit: int = 100,
+    offset: int = 0,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
     """
     Get records from a Teable table.
 
@@ -128,6 +139,7 @@ def get_records(table_name: str, limit: int = 100, offset: int = 0) -> List[Dict
         table_name: Name of the table
         limit: Maximum number of records to retrieve
         offset: Number of records to skip
+        fields: Only return these fields (default: all fields)
 
     Returns:
         List of records
@@ -141,8 +153,19 @@ def get_records(table_name: str, limit: int = 100, offset: int = 0) -> List[Dict
         'take': limit,
         'skip': offset
     }
+    if fields:
+        # Teable parses array query params qs-style; a bare repeated
+        # "projection" key would read as a string when only one field is given
+        params['projection[]'] = fields
+
+    response = _session.get(url, headers=get_headers(), params=params, timeout=TEABLE_TIMEOUT)
 
-    response = requests.get(url, headers=get_headers(), params=params)
+    if fields and response.status_code != 200:
+        # The projection is only an optimization; don't let a rejected one
+        # turn into an empty result
+        print(f"⚠️  Projected fetch from {table_name} failed ({response.status_code}), fetching all fields")
+        params.pop('projection[]')
+        response = _session.get(url, headers=get_headers(), params=params, timeout=TEABLE_TIMEOUT)
 
     if response.status_code == 200:
         data = response.json()
@@ -175,7 +198,7 @@ def count_records(table_name: str) -> int:
     url = f"{TEABLE_API_URL}/table/{table_id}/record"
     params = {'take': 1}
 
-    response = requests.get(url, headers=get_headers(), params=params)
+    response = _session.get(url, headers=get_headers(), params=params, timeout=TEABLE_TIMEOUT)
 
     if response.status_code == 200:
         data = response.json()
@@ -185,10 +208,11 @@ def count_records(table_name: str) -> int:
             return data['total']
         else:
             # Get all records to count (inefficient but works)
-            all_records_response = requests.get(
+            all_records_response = _session.get(
                 f"{TEABLE_API_URL}/table/{table_id}/record",
                 headers=get_headers(),
-                params={'take': 10000}  # Max records
+                params={'take': 10000},  # Max records
+                timeout=TEABLE_TIMEOUT,
             )
             if all_records_response.status_code == 200:
                 all_data = all_records_response.json()
@@ -223,7 +247,7 @@ def update_record(table_name: str, record_id: str, fields: Dict[str, Any]) -> Op
         }]
     }
 
-    response = requests.patch(url, headers=get_headers(), json=payload)
+    response = _session.patch(url, headers=get_headers(), json=payload, timeout=TEABLE_TIMEOUT)
 
     if response.status_code == 200:
         return response.json()
@@ -254,7 +278,7 @@ def update_records_batch(table_name: str, updates: List[Dict[str, Any]]) -> Opti
         "records": updates
     }
 
-    response = requests.patch(url, headers=get_headers(), json=payload)
+    response = _session.patch(url, headers=get_headers(), json=payload, timeout=TEABLE_TIMEOUT)
 
     if response.status_code == 200:
         return response.json()
@@ -283,7 +307,7 @@ def delete_record(table_name: str, record_id: str) -> bool:
     url = f"{TEABLE_API_URL}/table/{table_id}/record"
     params = {'recordIds': record_id}
 
-    response = requests.delete(url, headers=get_headers(), params=params)
+    response = _session.delete(url, headers=get_headers(), params=params, timeout=TEABLE_TIMEOUT)
 
     return response.status_code == 200
 
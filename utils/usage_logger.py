@@ -0,0 +1,104 @@
+"""Background writer for API key usage logs.
+
+Usage entries are queued from the request path and written in batches by a
+single daemon thread, so authenticated API requests never wait on SQLite or
+the Teable last_used_at update.
+"""
+
+import os
+import time
+import queue
+import atexit
+import threading
+from typing import Dict, List, Optional
+from models.api_key import log_api_key_usage_batch
+
+USAGE_QUEUE_MAXSIZE = 10000
+USAGE_BATCH_SIZE = 500
+USAGE_FLUSH_INTERVAL = 0.1  # seconds
+
+_usage_queue = queue.Queue(maxsize=USAGE_QUEUE_MAXSIZE)
+_worker_lock = threading.Lock()
+_worker_pid = None
+_dropped_entries = 0
+
+
+def enqueue_api_key_usage(
+    api_key: str, action: str, metadata: Optional[Dict] = None
+) -> bool:
+    """
+    Queue an API key usage entry for the background writer.
+    Returns False if the queue is full and the entry was dropped.
+    """
+    global _dropped_entries
+
+    start_usage_logger()
+
+    try:
+        _usage_queue.put_nowait((api_key, action, metadata))
+        return True
+    except queue.Full:
+        _dropped_entries += 1
+        if _dropped_entries % 1000 == 1:
+            print(f"Warning: API usage log queue full, dropped {_dropped_entries} entries")
+        return False
+
+
+def _collect_batch() -> List[tuple]:
+    """Wait for an entry, then gather more until the batch is full or stale."""
+    batch = [_usage_queue.get()]
+    deadline = time.monotonic() + USAGE_FLUSH_INTERVAL
+
+    while len(batch) < USAGE_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_usage_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+
+    return batch
+
+
+def _usage_worker():
+    """Drain the usage queue forever, writing one batch at a time."""
+    while True:
+        batch = _collect_batch()
+        try:
+            log_api_key_usage_batch(batch)
+        except Exception as e:
+            print(f"Warning: Failed to write API usage batch: {e}")
+
+
+def start_usage_logger():
+    """Start the background writer for this process if it isn't running."""
+    global _worker_pid
+
+    # Threads don't survive a fork, so each Gunicorn worker starts its own
+    if _worker_pid == os.getpid():
+        return
+
+    with _worker_lock:
+        if _worker_pid == os.getpid():
+            return
+
+        worker = threading.Thread(target=_usage_worker, daemon=True)
+        worker.start()
+        _worker_pid = os.getpid()
+
+
+def flush_usage_logs():
+    """Synchronously write any queued entries (used at shutdown)."""
+    batch = []
+    while True:
+        try:
+            batch.append(_usage_queue.get_nowait())
+        except queue.Empty:
+            break
+
+    if batch:
+        log_api_key_usage_batch(batch)
+
+
+atexit.register(flush_usage_logs)
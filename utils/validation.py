@@ -2,6 +2,7 @@
 
 import re
 import html
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 
 
@@ -83,7 +84,6 @@ def validate_dob(dob: str) -> bool:
 
     # Additional validation - check if it's a valid date
     try:
-        from datetime import datetime
         datetime.strptime(dob.strip(), "%m/%d/%Y")
         return True
     except ValueError: